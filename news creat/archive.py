@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+archive.py
+多日归档站点（news_webgen.py --archive，或单独运行）：
+- 每天的 news_data.json 存一份到 <归档目录>/data/<日期>.json，历史不再被覆盖
+- 每天一页 days/<日期>.html；首页 index.html 按日期翻页（更早的在 pages/<k>.html）
+- 关键词页 tags/<关键词>.html（更早的在 tags/<关键词>/<k>.html），keywords.html 列出所有关键词
+  （tags/ 下只放关键词页，任何关键词都不会与总览或别的关键词的翻页撞名）
+- 翻页按时间从旧到新编号，新增一天只影响最后一页，已满的旧页内容不变
+- 增量构建：manifest.json 记录每页输入的哈希，输入没变的页面直接跳过，不再生成的页面删除
+用法：
+  python archive.py --add code\news_data.json     # 收录当天数据并增量构建
+  python archive.py --rebuild                      # 忽略 manifest 全部重建（改了样式代码后）
+依赖：requests（可选 Pillow）
+"""
+import os
+import re
+import glob
+import json
+import hashlib
+import argparse
+import posixpath
+import tempfile
+from html import escape
+from datetime import datetime
+from assets import fetch_covers
+from image_proc import process_covers
+from renderer import render_page, article_card, parse_summary, use_covers, PAGE_HEAD, CARD, PAGE_TAIL
+from search_index import SEARCH_JS
+from metrics import timed, incr, write_report, REPORT_NAME
+
+ARCHIVE_DIR = r"F:/creat/pa/page/archive"
+MANIFEST_NAME = "manifest.json"
+DAYS_PER_PAGE = 30
+TAG_PER_PAGE = 60
+MIN_TAG_ARTICLES = 2      # 只出现过一次的关键词不单独成页
+TAG_PREVIEW = 3           # 关键词总览里每个关键词列出的最近标题数
+ARCHIVE_THEME = {}        # 首页/关键词页用固定主题：每天的主题不同，跟随它会让这些页面天天全部重建
+# 模板变了，已有页面的哈希随之失效
+TEMPLATE_VERSION = hashlib.sha1((PAGE_HEAD + CARD + PAGE_TAIL + SEARCH_JS).encode("utf-8")).hexdigest()[:12]
+
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_KW_SPLIT = re.compile(r"[、,，;；/|]+")
+_UNSAFE = re.compile(r'[\\/:*?"<>|#%&.\s]+')
+_RESERVED = {"con", "prn", "aux", "nul", *(f"com{i}" for i in range(10)), *(f"lpt{i}" for i in range(10))}   # Windows 设备名
+
+
+def _load_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_json(path, obj):
+    d = os.path.dirname(path)
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def add_day(data, archive_dir=ARCHIVE_DIR):
+    """收录一天的 news_data（同一天再次收录会覆盖）；返回日期。"""
+    date = data.get("date") or datetime.now().strftime("%Y-%m-%d")
+    if not _DATE.match(date):
+        raise ValueError(f"日期格式不对：{date}")
+    _write_json(os.path.join(archive_dir, "data", f"{date}.json"), data)
+    return date
+
+
+def load_days(archive_dir=ARCHIVE_DIR):
+    """返回 [(日期, news_data)]，按日期从旧到新。"""
+    days = []
+    for fp in sorted(glob.glob(os.path.join(archive_dir, "data", "*.json"))):
+        date = os.path.splitext(os.path.basename(fp))[0]
+        data = _load_json(fp, None)
+        if _DATE.match(date) and isinstance(data, dict):
+            days.append((date, data))
+    return days
+
+
+def keywords_of(a):
+    """摘要里“关键词：a、b、c”一行拆成列表。"""
+    kw = re.sub(r"^关键词[:：]?", "", parse_summary(a.get("raw_summary"))["keywords"])
+    return list(dict.fromkeys(k.strip() for k in _KW_SPLIT.split(kw) if k.strip()))
+
+
+def tag_slug(key):
+    """关键词 → 文件名；含文件名不允许的字符或是 Windows 设备名时替换掉并加哈希后缀，避免撞名。"""
+    safe = _UNSAFE.sub("_", key).strip("_")[:40]
+    if safe != key or safe.lower() in _RESERVED:
+        safe = f"{safe}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:6]}".lstrip("-")
+    return safe
+
+
+def _href(src, dst):
+    """站内相对链接（src/dst 均为相对归档目录的 / 分隔路径）。"""
+    return posixpath.relpath(dst, posixpath.dirname(src) or ".")
+
+
+def _nav(src, links):
+    """links: [(文字, 目标路径或 None)]；目标为 None 时只显示文字。"""
+    parts = [f'<a href="{escape(_href(src, dst))}">{escape(text)}</a>' if dst else f"<span>{escape(text)}</span>"
+             for text, dst in links if text]
+    return f'<nav class="pager">{"".join(parts)}</nav>'
+
+
+def _paged(items, per_page, path_of):
+    """items 按时间从旧到新分页；旧页编号固定，最新一页用 path_of(None)。
+    返回 [(路径, 本页条目（新的在前）, 更新一页路径, 更早一页路径, 页码, 总页数)]。"""
+    chunks = [items[i:i + per_page] for i in range(0, len(items), per_page)] or [[]]
+    n = len(chunks)
+    paths = [path_of(k + 1 if k < n - 1 else None) for k in range(n)]
+    return [(paths[k], chunk[::-1], paths[k + 1] if k < n - 1 else None, paths[k - 1] if k else None, k + 1, n)
+            for k, chunk in enumerate(chunks)]
+
+
+def _day_page(archive_dir, date, data, nav):
+    def render(path):
+        asset_dir = os.path.join(archive_dir, "assets")
+        theme = data.get("theme") or {}
+        articles = data.get("articles") or []
+        files = fetch_covers([a.get("cover_url") for a in articles], asset_dir) if use_covers(theme) else {}
+        rends = process_covers(files.values(), asset_dir)
+        cards = (article_card(a, files.get(a.get("cover_url")), rends, prefix="../assets/") for a in articles)
+        render_page(path, cards, theme=theme, date=date, intro=data.get("overall_intro") or "", nav=nav)
+    return {"day": data, "nav": nav}, render
+
+
+def _list_page(title, cards, nav, intro=""):
+    def render(path):
+        render_page(path, cards, theme=ARCHIVE_THEME, title=title, intro=intro, nav=nav)
+    return {"title": title, "cards": cards, "nav": nav, "intro": intro}, render
+
+
+def plan(archive_dir, days):
+    """返回 [(相对路径, 哈希输入, render(绝对路径))]。"""
+    pages = []
+    home = "index.html"
+    tags_home = "keywords.html"
+
+    # 每天一页
+    day_path = lambda d: f"days/{d}.html"
+    for i, (date, data) in enumerate(days):
+        src = day_path(date)
+        nav = _nav(src, [("← 前一天", day_path(days[i - 1][0]) if i else None), ("归档首页", home),
+                         ("关键词", tags_home), ("后一天 →", day_path(days[i + 1][0]) if i + 1 < len(days) else None)])
+        pages.append((src, *_day_page(archive_dir, date, data, nav)))
+
+    # 首页（按日期翻页）
+    for src, chunk, newer, older, k, n in _paged(days, DAYS_PER_PAGE, lambda k: f"pages/{k}.html" if k else home):
+        cards = [{"title": date, "meta": f"{len(data.get('articles') or [])} 篇",
+                  "bullets": [a.get("title") or "" for a in data.get("articles") or []],
+                  "other": [data.get("overall_intro") or ""], "link": _href(src, day_path(date)),
+                  "internal": True, "button": "查看当天"} for date, data in chunk]
+        nav = _nav(src, [("← 较新", newer), (f"第 {k}/{n} 页", None), ("较早 →", older), ("关键词", tags_home)])
+        pages.append((src, *_list_page("每日新闻归档", cards, nav)))
+
+    # 关键词页
+    tags = {}
+    for date, data in days:
+        for a in data.get("articles") or []:
+            for kw in keywords_of(a):
+                tags.setdefault(kw.casefold(), {"name": kw, "items": []})["items"].append((date, a))
+    tags = {key: t for key, t in tags.items() if len(t["items"]) >= MIN_TAG_ARTICLES}
+    overview = []
+    for key, t in sorted(tags.items(), key=lambda kv: (-len(kv[1]["items"]), kv[0])):
+        slug = tag_slug(key)
+        paged = _paged(t["items"], TAG_PER_PAGE, lambda k: f"tags/{slug}/{k}.html" if k else f"tags/{slug}.html")
+        for src, chunk, newer, older, k, n in paged:
+            cards = []
+            for date, a in chunk:
+                c = article_card(a)
+                c["meta"] = " · ".join(filter(None, [date, a.get("site")]))
+                cards.append(c)
+            nav = _nav(src, [("← 较新", newer), (f"第 {k}/{n} 页", None), ("较早 →", older),
+                             ("全部关键词", tags_home), ("归档首页", home)])
+            pages.append((src, *_list_page(f"关键词：{t['name']}", cards, nav)))
+        latest = t["items"][::-1][:TAG_PREVIEW]
+        overview.append({"title": t["name"], "meta": f"{len(t['items'])} 篇 · 最近 {latest[0][0]}",
+                         "bullets": [a.get("title") or "" for _, a in latest],
+                         "link": _href(tags_home, paged[-1][0]), "internal": True, "button": "查看"})
+    pages.append((tags_home, *_list_page("关键词", overview, _nav(tags_home, [("归档首页", home)]))))
+    return pages
+
+
+def _page_hash(payload):
+    blob = json.dumps([TEMPLATE_VERSION, payload], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _remove(archive_dir, rel):
+    path = os.path.join(archive_dir, *rel.split("/"))
+    for fp in (path, os.path.splitext(path)[0] + ".search.json"):
+        if os.path.exists(fp):
+            os.remove(fp)
+
+
+def build(archive_dir=ARCHIVE_DIR, rebuild=False):
+    """增量构建归档站点；rebuild=True 时忽略 manifest 全部重建。返回首页路径。"""
+    mpath = os.path.join(archive_dir, MANIFEST_NAME)
+    old = _load_json(mpath, {})
+    done, rendered = {}, 0
+    with timed("archive"):
+        days = load_days(archive_dir)
+        pages = plan(archive_dir, days)
+        try:
+            for rel, payload, render in pages:
+                h = _page_hash(payload)
+                path = os.path.join(archive_dir, *rel.split("/"))
+                if rebuild or old.get(rel) != h or not os.path.exists(path):
+                    render(path)
+                    rendered += 1
+                done[rel] = h
+        except BaseException:
+            # 已渲染的页面记新哈希，其余保持原记录（与磁盘上的文件一致）
+            _write_json(mpath, {**old, **done})
+            raise
+        stale = [rel for rel in old if rel not in done]
+        for rel in stale:
+            _remove(archive_dir, rel)
+        _write_json(mpath, done)
+    incr("archive.rendered", rendered)
+    incr("archive.skipped", len(pages) - rendered)
+    incr("archive.removed", len(stale))
+    print(f"[归档] {len(days)} 天：渲染 {rendered} 页，跳过 {len(pages) - rendered} 页，删除 {len(stale)} 页")
+    return os.path.join(archive_dir, "index.html")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--add", type=str, nargs="*", default=[], help="要收录的 news_data.json")
+    ap.add_argument("--dir", type=str, default=ARCHIVE_DIR)
+    ap.add_argument("--rebuild", action="store_true", help="忽略 manifest，全部重建")
+    args = ap.parse_args()
+
+    for fp in args.add:
+        with open(fp, "r", encoding="utf-8") as f:
+            print(f"[收录] {add_day(json.load(f), args.dir)}  <- {fp}")
+    out_html = build(args.dir, rebuild=args.rebuild)
+    print(f"[OK] 归档首页：{out_html}")
+    write_report(os.path.join("code", REPORT_NAME), merge_existing=True)
+
+
+if __name__ == "__main__":
+    main()
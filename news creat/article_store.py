@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+article_store.py
+跨天持久的文章库（SQLite），按规范化 URL 记录：
+- html_hash：原始网页哈希，未变化时直接复用上次解析出的标题/正文/首图，跳过解析
+- body_hash：正文哈希，正文未变化时复用上次的摘要，跳过 LLM
+- first_seen / last_seen：首次、最近一次出现的日期（YYYY-MM-DD）
+- minhash：正文的 MinHash 签名（dedup.py），跨天识别换了 URL 的同一篇报道
+用法：
+  store = ArticleStore()
+  rec = store.get(url)
+  store.upsert(url, html_hash=..., body_hash=..., title=..., body=..., cover=..., summary=...)
+  store.history(days=7)   # 前几天出现过的 [(title, body)]，供 ranker 计算新颖度
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+STORE_PATH = os.path.join("code", "cache", "articles.sqlite")
+
+# 不影响页面内容的跟踪参数
+_TRACKING_PARAMS = ("utm_", "spm", "at_medium", "at_campaign", "at_link_origin", "xtor")
+
+
+def normalize_url(url):
+    """小写 scheme/host，去掉默认端口、锚点、跟踪参数与末尾斜杠，查询参数排序。"""
+    parts = urlsplit((url or "").strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(_TRACKING_PARAMS)]
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ""))
+
+
+def content_hash(s):
+    return hashlib.sha1((s or "").encode("utf-8")).hexdigest()
+
+
+def today():
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+_FIELDS = ("url", "link", "html_hash", "body_hash", "title", "body", "cover",
+           "summary", "first_seen", "last_seen", "updated", "minhash")
+
+
+class ArticleStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS articles(
+            url TEXT PRIMARY KEY, link TEXT, html_hash TEXT, body_hash TEXT,
+            title TEXT, body TEXT, cover TEXT, summary TEXT,
+            first_seen TEXT, last_seen TEXT, updated REAL, minhash BLOB)""")
+        # 旧库补列
+        cols = {row[1] for row in self._db.execute("PRAGMA table_info(articles)")}
+        if "minhash" not in cols:
+            self._db.execute("ALTER TABLE articles ADD COLUMN minhash BLOB")
+        self._db.commit()
+
+    def get(self, url):
+        with self._lock:
+            row = self._db.execute(f"SELECT {','.join(_FIELDS)} FROM articles WHERE url=?",
+                                   (normalize_url(url),)).fetchone()
+        return dict(zip(_FIELDS, row)) if row else None
+
+    def seen_before(self, url, day=None):
+        """该 URL 是否在 day（默认今天）之前的运行中出现过。"""
+        rec = self.get(url)
+        return bool(rec and rec["first_seen"] and rec["first_seen"] < (day or today()))
+
+    def upsert(self, url, **fields):
+        key, day = normalize_url(url), today()
+        with self._lock:
+            row = self._db.execute("SELECT first_seen FROM articles WHERE url=?", (key,)).fetchone()
+            if row is None:
+                self._db.execute("INSERT INTO articles(url, link, first_seen, last_seen, updated) VALUES(?,?,?,?,?)",
+                                 (key, url, day, day, time.time()))
+            cols = {k: v for k, v in fields.items() if k in _FIELDS and k not in ("url", "first_seen")}
+            cols.update(link=url, last_seen=day, updated=time.time())
+            self._db.execute(f"UPDATE articles SET {','.join(f'{k}=?' for k in cols)} WHERE url=?",
+                             (*cols.values(), key))
+            self._db.commit()
+
+    def history(self, days=7, day=None, limit=5000):
+        """day（默认今天）之前 days 天内出现过、且今天之前就已收录的文章 [(title, body)]，按最近出现排序。"""
+        day = day or today()
+        since = (datetime.strptime(day, "%Y-%m-%d") - timedelta(days=days)).strftime("%Y-%m-%d")
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT title, body FROM articles WHERE first_seen < ? AND last_seen >= ? AND body IS NOT NULL "
+                "ORDER BY last_seen DESC LIMIT ?", (day, since, int(limit))).fetchall()
+        return [(t or "", b or "") for t, b in rows]
+
+    def signatures(self, days=3, day=None):
+        """day（默认今天）之前 days 天内出现过的文章签名 [(url, minhash, summary)]。"""
+        day = day or today()
+        since = (datetime.strptime(day, "%Y-%m-%d") - timedelta(days=days)).strftime("%Y-%m-%d")
+        with self._lock:
+            return self._db.execute(
+                "SELECT url, minhash, summary FROM articles WHERE first_seen < ? AND last_seen >= ? "
+                "AND minhash IS NOT NULL", (day, since)).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+assets.py
+封面图下载（news_webgen.py 与 daily_news_generator.py 共用）：
+- 并发下载（fetcher.fetch_all，按 host 限流），同一 URL 只下载一次
+- asset 目录下的 index.json 记录 URL → 文件名；文件仍在时直接复用，不再发请求
+- 文件名取内容哈希，不同 URL 的相同图片只存一份
+- 先写临时文件再 os.replace，中途失败不会留下半张图
+用法：
+  from assets import fetch_covers
+  files = fetch_covers([url, ...], asset_dir)   # {url: 文件名}，失败的 URL 不在结果里
+依赖：requests
+"""
+import os
+import json
+import hashlib
+import tempfile
+from http_client import http_get
+from fetcher import fetch_all, DEFAULT_WORKERS, DEFAULT_PER_HOST
+from metrics import timed, incr
+
+INDEX_NAME = "index.json"
+_EXTS = (("png", ".png"), ("jpeg", ".jpg"), ("jpg", ".jpg"), ("webp", ".webp"), ("gif", ".gif"), ("avif", ".avif"))
+
+
+def _ext_for(content_type):
+    ct = (content_type or "").lower()
+    for key, ext in _EXTS:
+        if key in ct:
+            return ext
+    return ".jpg"
+
+
+def load_index(asset_dir):
+    try:
+        with open(os.path.join(asset_dir, INDEX_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index(asset_dir, index):
+    path = os.path.join(asset_dir, INDEX_NAME)
+    fd, tmp = tempfile.mkstemp(dir=asset_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def download(url, asset_dir, headers=None):
+    """下载到临时文件并边写边算哈希，再按内容哈希改名；返回文件名，失败返回 None。"""
+    tmp = None
+    try:
+        with timed("download_image"):
+            r = http_get(url, headers=headers, timeout=30, stream=True)
+            r.raise_for_status()
+            h = hashlib.sha1()
+            fd, tmp = tempfile.mkstemp(dir=asset_dir, suffix=".part")
+            with os.fdopen(fd, "wb") as f:
+                for chunk in r.iter_content(65536):
+                    f.write(chunk)
+                    h.update(chunk)
+                    incr("download_image.bytes", len(chunk))
+        fn = h.hexdigest()[:20] + _ext_for(r.headers.get("Content-Type"))
+        fp = os.path.join(asset_dir, fn)
+        if os.path.exists(fp):
+            incr("download_image.same_bytes")
+            os.remove(tmp)
+        else:
+            os.replace(tmp, fp)
+        return fn
+    except Exception as e:
+        print(f"[下载图片失败] {url}: {e}")
+        incr("download_image.failed")
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+
+
+def fetch_covers(urls, asset_dir, headers=None, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST):
+    """返回 {url: 文件名}；已下载过且文件仍在的 URL 不发请求。"""
+    os.makedirs(asset_dir, exist_ok=True)
+    index = load_index(asset_dir)
+    wanted = list(dict.fromkeys(u for u in urls if u))
+    result = {u: index[u] for u in wanted
+              if index.get(u) and os.path.exists(os.path.join(asset_dir, index[u]))}
+    incr("download_image.skipped", len(result))
+    todo = [u for u in wanted if u not in result]
+    if todo:
+        for u, fn in zip(todo, fetch_all(todo, lambda u: download(u, asset_dir, headers), workers=workers, per_host=per_host)):
+            if fn:
+                result[u] = index[u] = fn
+        save_index(asset_dir, index)
+    return result
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+bench.py
+离线基准：本地桩服务器回放网页、图片与 chat-completions 响应，不访问外网、不消耗 API 额度。
+端到端执行 load_pairs → 抓取/解析 → 摘要 → pick_top → news_webgen 渲染，
+按不同文章数（默认 18 / 200 / 2000）报告吞吐与各阶段耗时（来自 metrics）。
+用法：
+  python bench.py                                   # 合成语料
+  python bench.py --sizes 18,200 --corpus code/cache/pages   # 回放录制的网页（*.html 或 page_cache 的 *.json）
+  python bench.py --chat fixtures/chat.json --llm-latency 0.3
+  # chat.json：{"summarize": "...", "pick_top": "[0,1]", "intro": "...", "theme": "{...}"}，缺省项用内置回复
+依赖：requests、beautifulsoup4
+"""
+import os
+import re
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import metrics
+import page_cache
+import llm_scheduler
+import news_analyzer
+import news_webgen
+from html_backend import load_corpus
+from llm_cache import configure as configure_llm_cache
+from fetcher import DEFAULT_WORKERS
+from extract_pool import DEFAULT_WORKERS as EXTRACT_WORKERS
+
+DEFAULT_SIZES = [18, 200, 2000]
+DEFAULT_LLM_LATENCY = 0.05   # 模拟每次 LLM 请求的网络往返（秒）
+IMAGE_BYTES = 24 * 1024
+IMAGE_SIZE = (1600, 1000)    # 装了 Pillow 时生成真实 JPEG，便于测图片处理阶段
+DUP_EVERY = 10               # 每 10 篇里有 1 篇是上一篇换了 URL/标题的转载
+
+_WORDS = ("政府 发布 经济 数据 增长 市场 企业 投资 科技 创新 国际 合作 会议 代表 表示 "
+          "计划 城市 居民 教育 医疗 改革 政策 全球 能源 气候 安全 交通 文化 研究 报告").split()
+
+CANNED = {
+    "intro": "今天的新闻覆盖经济、科技与国际合作等领域，多项政策与数据发布值得关注。",
+    "theme": json.dumps({
+        "name": "基准", "use_covers": True, "style": "glass",
+        "palette": {"bg": "#0f172a", "surface": "#111827", "text": "#e5e7eb", "muted": "#94a3b8",
+                    "brand": "#60a5fa", "accent1": "#a78bfa", "accent2": "#34d399"},
+        "shapes": [{"type": "blob", "color": "#60a5fa", "opacity": 0.18, "size": "680px",
+                    "position": {"top": "-120px", "right": "-120px"}}]}, ensure_ascii=False),
+}
+
+
+def _sentence(rng):
+    return "".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 20))) + "。"
+
+
+def synthetic_page(i):
+    """
+    确定性生成第 i 篇网页：导航/侧栏噪声 + 正文段落 + og:image；约一半是短讯，
+    每 DUP_EVERY 篇有一篇正文与上一篇几乎相同（换了标题，多一句话）。
+    """
+    dup = i % DUP_EVERY == DUP_EVERY - 1
+    rng = random.Random(i - 1 if dup else i)
+    title = f"第{i}号新闻：" + "".join(rng.choice(_WORDS) for _ in range(5))
+    nav = "".join(f"<li><a href='/c/{k}'>{rng.choice(_WORDS)}</a></li>" for k in range(20))
+    n_paras = rng.randint(2, 4) if rng.random() < 0.5 else rng.randint(6, 16)
+    paras = "".join(f"<p>{''.join(_sentence(rng) for _ in range(rng.randint(2, 5)))}</p>"
+                    for _ in range(n_paras))
+    if dup:
+        paras += "<p>本文转载自其他栏目。</p>"
+    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title>
+<meta property="og:title" content="{title}"><meta property="og:image" content="/img/{i}.jpg">
+<script>var x = {i};</script></head><body><nav><ul>{nav}</ul></nav>
+<div class="main"><article><h1>{title}</h1><img src="/img/{i}.jpg">{paras}
+<aside><a href="/r/{i}">相关阅读</a></aside></article></div>
+<footer><a href="/about">关于我们</a></footer></body></html>"""
+
+
+def _cover_bytes():
+    try:
+        import io
+        from PIL import Image
+    except ImportError:
+        return bytes(random.Random(0).getrandbits(8) for _ in range(IMAGE_BYTES))
+    im = Image.effect_noise(IMAGE_SIZE, 64).convert("RGB")
+    buf = io.BytesIO()
+    im.save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+def _localize_images(html):
+    """录制的网页里的外链图片改指向桩服务器，渲染阶段下载封面时不出网。"""
+    return re.sub(r"""((?:src|data-src|content)\s*=\s*["'])(?:https?:)?//[^"']+""", r"\1/img/0.jpg", html)
+
+
+def _canned_reply(messages, chat):
+    system = messages[0]["content"] if messages else ""
+    user = messages[-1]["content"] if messages else ""
+    if "新闻价值" in system:
+        m = re.search(r"最重要的 (\d+) 条", user)
+        return chat.get("pick_top") or json.dumps(list(range(int(m.group(1)) if m else 10)))
+    if "UI/UX" in system:
+        return chat.get("theme") or CANNED["theme"]
+    if "导语" in system:
+        return chat.get("intro") or CANNED["intro"]
+    if chat.get("summarize"):
+        return chat["summarize"]
+    titles = re.findall(r"【页面标题】(.*)", user) or ["新闻"]
+    summaries = [f"{t[:28]}\n• 有关部门发布最新进展。\n• 相关企业与居民受到影响。\n"
+                 f"• 后续政策仍在研究之中。\n关键词：经济, 政策" for t in titles]
+    if "=== 文章" not in user:
+        return summaries[0]
+    return "\n\n".join(f"=== 摘要 {k + 1} ===\n{s}" for k, s in enumerate(summaries))
+
+
+class StubServer:
+    """127.0.0.1 上的桩服务器：/a/<i>.html 网页、/img/<i>.jpg 图片、/v1/chat/completions。"""
+    def __init__(self, pages=None, chat=None, llm_latency=DEFAULT_LLM_LATENCY):
+        self.pages, self.chat, self.llm_latency = pages or [], chat or {}, llm_latency
+        self._synthetic, self._lock = {}, threading.Lock()
+        self.image = _cover_bytes()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.httpd.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def page(self, i):
+        if self.pages:
+            return self.pages[i % len(self.pages)]
+        with self._lock:
+            if i not in self._synthetic:
+                self._synthetic[i] = synthetic_page(i)
+            return self._synthetic[i]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True   # 头和正文分两次写，避免 keep-alive 下的 40ms 延迟确认
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, code, body, ctype):
+                self.send_response(code)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                m = re.match(r"/a/(\d+)\.html$", self.path)
+                if m:
+                    return self._send(200, stub.page(int(m.group(1))).encode("utf-8"), "text/html; charset=utf-8")
+                if self.path.startswith("/img/"):
+                    return self._send(200, stub.image, "image/jpeg")
+                self._send(404, b"not found", "text/plain")
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if not self.path.endswith("/chat/completions"):
+                    return self._send(404, b"not found", "text/plain")
+                messages = json.loads(body or b"{}").get("messages") or []
+                time.sleep(stub.llm_latency)
+                content = _canned_reply(messages, stub.chat)
+                prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 2
+                reply = {"choices": [{"message": {"role": "assistant", "content": content}}],
+                         "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 2}}
+                self._send(200, json.dumps(reply, ensure_ascii=False).encode("utf-8"), "application/json")
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def write_source(path, base, n):
+    """按 load_pairs 的格式写出 n 条（文本/URL）记录。"""
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(f"文本: 基准新闻 {i}\nURL: {base}/a/{i}.html\n---\n")
+    return path
+
+
+def run_once(server, n, workdir, **options):
+    """options 原样传给 news_analyzer.analyze（workers、per_host、summary_batch、rank 等）。"""
+    metrics.reset()
+    source = write_source(os.path.join(workdir, f"source_{n}.txt"), server.base, n)
+    t0 = time.perf_counter()
+    with metrics.timed("total.analyze"):
+        data = news_analyzer.analyze(news_analyzer.load_pairs(source), provider="openai", limit=n,
+                                     use_store=False, **options)
+    with metrics.timed("total.render"):
+        news_webgen.render(data, page_dir=os.path.join(workdir, f"page_{n}"))
+    wall = time.perf_counter() - t0
+    snap = metrics.snapshot()
+    requests = sum(t["count"] for name, t in snap["timers"].items() if name.startswith("llm."))
+    return {"articles": n, "llm_requests": requests, "wall_s": round(wall, 3),
+            "articles_per_s": round(n / wall, 2) if wall else 0.0,
+            "timers": snap["timers"], "counters": snap["counters"]}
+
+
+def print_result(res):
+    print(f"[基准] {res['articles']} 篇：用时 {res['wall_s']:.2f}s，吞吐 {res['articles_per_s']:.1f} 篇/s，"
+          f"LLM 请求 {res['llm_requests']} 次")
+    print(f"  {'阶段':24s}{'次数':>8s}{'平均(ms)':>12s}{'最大(ms)':>12s}{'合计(s)':>10s}")
+    for name, t in res["timers"].items():
+        print(f"  {name:24s}{t['count']:>8d}{t['avg_s'] * 1000:>12.1f}{t['max_s'] * 1000:>12.1f}{t['total_s']:>10.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=str, default=",".join(map(str, DEFAULT_SIZES)), help="逗号分隔的文章数")
+    ap.add_argument("--corpus", type=str, default=None, help="录制网页目录（*.html / page_cache *.json），默认合成")
+    ap.add_argument("--chat", type=str, default=None, help="固定的 LLM 回复（JSON，按 summarize/pick_top/intro/theme）")
+    ap.add_argument("--llm-latency", type=float, default=DEFAULT_LLM_LATENCY, help="桩服务器每次 LLM 回复前的延迟（秒）")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    ap.add_argument("--per-host", type=int, default=DEFAULT_WORKERS, help="桩服务器只有一个主机，默认不额外限流")
+    ap.add_argument("--llm-workers", type=int, default=news_analyzer.DEFAULT_INFLIGHT)
+    ap.add_argument("--extract-workers", type=int, default=EXTRACT_WORKERS)
+    ap.add_argument("--summary-batch", type=int, default=news_analyzer.SUMMARY_BATCH, help="1 为逐篇摘要")
+    ap.add_argument("--rank", type=str, default=news_analyzer.RANK_MODE, choices=["llm", "local", "hybrid"])
+    ap.add_argument("--shortlist", type=int, default=news_analyzer.SHORTLIST)
+    ap.add_argument("--out", type=str, default=os.path.join("code", "bench_report.json"))
+    args = ap.parse_args()
+
+    pages = [_localize_images(html) for _, html in load_corpus(args.corpus)] if args.corpus else []
+    if args.corpus and not pages:
+        raise FileNotFoundError(f"语料目录里没有网页：{args.corpus}")
+    chat = {}
+    if args.chat:
+        with open(args.chat, "r", encoding="utf-8") as f:
+            chat = json.load(f)
+
+    # 只走本地：关闭网页/LLM 缓存，放开 token 预算，接口指向桩服务器
+    page_cache.configure(enabled=False)
+    configure_llm_cache(enabled=False)
+    llm_scheduler.set_budget("openai", 10 ** 12)
+    os.environ["OPENAI_API_KEY"] = "bench"
+
+    results = []
+    with StubServer(pages, chat, args.llm_latency) as server, tempfile.TemporaryDirectory() as workdir:
+        news_analyzer.API_BASE["openai"] = server.base + "/v1"
+        print(f"[基准] 桩服务器 {server.base}，语料：{args.corpus or '合成'}")
+        for n in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            res = run_once(server, n, workdir, workers=args.workers, per_host=args.per_host,
+                           llm_workers=args.llm_workers, extract_workers=args.extract_workers,
+                           summary_batch=args.summary_batch, rank=args.rank, shortlist=args.shortlist)
+            print_result(res)
+            results.append(res)
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"corpus": args.corpus or "synthetic", "llm_latency": args.llm_latency,
+                   "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"[OK] 基准报告：{args.out}")
+
+
+if __name__ == "__main__":
+    main()
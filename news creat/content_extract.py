@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+content_extract.py
+正文/首图抽取（news_analyzer.py 与 daily_news_generator.py 共用）：
+- 一次遍历整棵树，为每个候选块（CANDIDATE 选择器命中的节点）累计 <p> 文本量与链接文本量
+- 按 文本量 × (1 - 链接密度) 选出正文块，嵌套/重叠的候选不会被重复遍历
+- 输出契约不变：(main_text, cover)
+- parse_article：按 html_backend 选定的解析后端建树并一次性返回 (title, main_text, cover)
+"""
+import re
+import time
+from urllib.parse import urljoin
+from bs4 import NavigableString, CData
+from html_backend import make_soup
+
+CANDIDATE = [
+    "article",".article",".post",".entry-content",".article-content",
+    "#content",".content","#main",".main",".news"
+]
+
+# 候选块内部需要剔除的噪声节点
+BAD_TAGS = {"script","style","noscript","header","footer","nav","aside","form"}
+
+_TEXT_TYPES = (NavigableString, CData)
+
+
+def text_len(s):
+    return len(re.sub(r"\s+","", s or ""))
+
+
+def extract_title(soup, fallback=""):
+    og = soup.select_one('meta[property="og:title"]') or soup.select_one('meta[name="og:title"]')
+    if og and og.get("content"):
+        return og["content"].strip()
+    h1 = soup.find("h1")
+    if h1 and h1.get_text(strip=True):
+        return h1.get_text(strip=True)
+    if soup.title and soup.title.string:
+        return soup.title.string.strip()
+    return fallback or "未命名标题"
+
+
+def _parse_selector(sel):
+    """仅支持 tag / .class / #id 以及空格分隔的后代选择器（如 "article .content"）。"""
+    parts = []
+    for p in sel.split():
+        if p.startswith("."):
+            parts.append((None, p[1:], None))
+        elif p.startswith("#"):
+            parts.append((None, None, p[1:]))
+        else:
+            parts.append((p, None, None))
+    return parts
+
+
+def _match(tag, simple):
+    name, cls, id_ = simple
+    if name and tag.name != name:
+        return False
+    if cls and cls not in (tag.get("class") or []):
+        return False
+    if id_ and tag.get("id") != id_:
+        return False
+    return True
+
+
+def _is_candidate(tag, parsed, stack):
+    for parts in parsed:
+        if not _match(tag, parts[-1]):
+            continue
+        # 后代选择器：其余部分需按顺序出现在祖先链上
+        need = list(parts[:-1])
+        for frame in reversed(stack):
+            if need and _match(frame.node, need[-1]):
+                need.pop()
+        if not need:
+            return True
+    return False
+
+
+class _Frame:
+    __slots__ = ("node", "txt", "ptxt", "link", "plink", "is_p", "is_a", "is_cand", "is_skip")
+
+    def __init__(self, node, is_p=False, is_a=False, is_cand=False, is_skip=False):
+        self.node = node
+        self.txt = self.ptxt = self.link = self.plink = 0
+        self.is_p, self.is_a, self.is_cand, self.is_skip = is_p, is_a, is_cand, is_skip
+
+
+def _score(frame):
+    """正文量取 <p> 文本（没有 <p> 时取全部文本），再按链接密度打折。"""
+    if frame.ptxt:
+        length, links = frame.ptxt, frame.plink
+    else:
+        length, links = frame.txt, frame.link
+    if not length:
+        return 0
+    return length * (1 - min(links, length) / length)
+
+
+def find_main_block(soup, selectors=CANDIDATE):
+    """单次遍历返回得分最高的候选块；没有任何有效候选时返回 None。"""
+    parsed = [_parse_selector(s) for s in selectors]
+    stack = [_Frame(soup)]
+    cands = []
+    in_p = in_a = in_cand = in_skip = 0
+
+    def _close(f):
+        nonlocal in_p, in_a, in_cand, in_skip
+        in_p -= f.is_p; in_a -= f.is_a; in_cand -= f.is_cand; in_skip -= f.is_skip
+        parent = stack[-1]
+        parent.txt += f.txt; parent.ptxt += f.ptxt
+        parent.link += f.link; parent.plink += f.plink
+
+    for el in soup.descendants:
+        while len(stack) > 1 and el.parent is not stack[-1].node:
+            _close(stack.pop())
+        if isinstance(el, NavigableString):
+            if in_skip or type(el) not in _TEXT_TYPES:
+                continue
+            n = text_len(el)
+            if not n:
+                continue
+            top = stack[-1]
+            top.txt += n
+            if in_p:
+                top.ptxt += n
+            if in_a:
+                top.link += n
+                if in_p:
+                    top.plink += n
+            continue
+        # 候选块内的噪声节点整棵跳过（等价于先 decompose 再统计）
+        is_skip = bool(in_cand and el.name in BAD_TAGS)
+        is_cand = (not in_skip and not is_skip) and _is_candidate(el, parsed, stack)
+        f = _Frame(el, is_p=el.name == "p", is_a=el.name == "a", is_cand=is_cand, is_skip=is_skip)
+        in_p += f.is_p; in_a += f.is_a; in_cand += f.is_cand; in_skip += f.is_skip
+        stack.append(f)
+        if is_cand:
+            cands.append(f)
+    while len(stack) > 1:
+        _close(stack.pop())
+
+    best, best_score = None, 0
+    for f in cands:
+        s = _score(f)
+        if s > best_score:
+            best, best_score = f.node, s
+    return best
+
+
+def _clean(node):
+    for bad in node.find_all(BAD_TAGS):
+        bad.decompose()
+    return node
+
+
+def extract_main_and_cover(soup, base_url, selectors=CANDIDATE):
+    best = find_main_block(soup, selectors)
+    if best is None:
+        text = " ".join([p.get_text(" ", strip=True) for p in soup.find_all("p")])
+        imgs = soup.find_all("img")
+    else:
+        _clean(best)
+        text = " ".join([p.get_text(" ", strip=True) for p in best.find_all("p")]) or best.get_text(" ", strip=True)
+        imgs = best.find_all("img")
+    main = re.sub(r"\s+"," ", text).strip()
+
+    cover = None
+    og = soup.select_one('meta[property="og:image"]') or soup.select_one('meta[name="og:image"]')
+    if og and og.get("content"):
+        cover = urljoin(base_url, og["content"].strip())
+    if not cover:
+        for im in imgs:
+            src = im.get("src") or im.get("data-src") or im.get("data-original")
+            if not src:
+                continue
+            full = urljoin(base_url, src)
+            if any(ext in full.lower() for ext in [".svg",".ico",".gif"]):
+                continue
+            cover = full; break
+    return main, cover
+
+
+def parse_article(html, url, fallback="", backend=None, selectors=CANDIDATE, timings=None):
+    """
+    解析一篇网页，返回 (title, main_text, cover)。
+    timings 为 dict 时累加建树（parse）与抽取（extract）耗时，供进程池带回主进程统计。
+    """
+    t0 = time.perf_counter()
+    soup = make_soup(html, backend)
+    t1 = time.perf_counter()
+    title = extract_title(soup, fallback=fallback)
+    body, cover = extract_main_and_cover(soup, url, selectors)
+    if timings is not None:
+        timings["parse"] = timings.get("parse", 0.0) + t1 - t0
+        timings["extract"] = timings.get("extract", 0.0) + time.perf_counter() - t1
+    return title, body, cover
@@ -4,9 +4,11 @@
 用法：
   1) python daily_news_generator.py --source code\result_with_links22.txt
   2) 直接 python daily_news_generator.py   # 未传 --source 时将自动选择 code/ 下最新的 result_with_links*.txt
+  3) 加 --local-rank：用本地排序选题，省去一次 LLM 调用（需 numpy）
 
 需求：
   pip install requests beautifulsoup4
+  （可选）pip install lxml   # 安装后自动用作 HTML 解析后端
 
 注意：
   请在系统环境变量中设置 OPENAI_API_KEY（不要把 key 写入代码）：
@@ -17,19 +19,32 @@ import os
 import re
 import sys
 import json
-import hashlib
 from datetime import datetime
-from urllib.parse import urljoin
 import glob
-import requests
+from urllib.parse import urlparse
+from http_client import http_post
 from bs4 import BeautifulSoup
+from fetcher import fetch_all
+from llm_scheduler import with_rate_limit, estimate_tokens, map_ordered
+from llm_cache import cached_completion, configure as configure_llm_cache
+from page_cache import fetch_cached
+from content_extract import extract_main_and_cover
+from html_backend import make_soup
+from metrics import timed, incr, write_report, REPORT_NAME
+from assets import fetch_covers
+from image_proc import process_covers
+from renderer import render_page, article_card
+from prompt_budget import fit_body, DEFAULT_BUDGET as PROMPT_BUDGET
 
 # ---------------- 配置 ----------------
-OPENAI_CHAT_ENDPOINT = "https://api.openai.com/v1/chat/completions"
+OPENAI_CHAT_ENDPOINT = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/") + "/chat/completions"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "你的秘钥")
 REQUEST_TIMEOUT = 45
 UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
       "(KHTML, like Gecko) Chrome/123.0 Safari/537.36")
+FETCH_WORKERS = 8    # 并发抓取的全局上限
+FETCH_PER_HOST = 4   # 同一站点的并发上限
+LLM_WORKERS = 4      # 同时在途的摘要请求数
 
 # 输出目录（与你的项目结构一致）
 PAGE_DIR = r"F:/creat/pa/page"
@@ -38,7 +53,8 @@ os.makedirs(ASSET_DIR, exist_ok=True)
 
 
 # ---------------- OpenAI 请求 ----------------
-def make_chat_request(messages, model="gpt-4o-mini", temperature=0.2, max_tokens=1200):
+def make_chat_request(messages, model="gpt-4o-mini", temperature=0.2, max_tokens=1200, kind="chat"):
+    """kind 用于统计：summarize / pick_top / intro。"""
     if not OPENAI_API_KEY:
         print("未检测到 OPENAI_API_KEY 环境变量。请先在系统里设置。")
         return None
@@ -52,8 +68,8 @@ def make_chat_request(messages, model="gpt-4o-mini", temperature=0.2, max_tokens
         "temperature": temperature,
         "max_tokens": max_tokens,
     }
-    try:
-        resp = requests.post(
+    def _send():
+        resp = http_post(
             OPENAI_CHAT_ENDPOINT,
             headers=headers,
             json=payload,
@@ -61,9 +77,20 @@ def make_chat_request(messages, model="gpt-4o-mini", temperature=0.2, max_tokens
         )
         resp.raise_for_status()
         data = resp.json()
+        usage = data.get("usage") or {}
+        incr(f"llm.{kind}.prompt_tokens", usage.get("prompt_tokens", 0))
+        incr(f"llm.{kind}.completion_tokens", usage.get("completion_tokens", 0))
         return data["choices"][0]["message"]["content"]
+
+    try:
+        # 先查本地缓存；未命中时 429 按 Retry-After 退避，并计入每分钟 token 预算
+        with timed(f"llm.{kind}"):
+            return cached_completion(
+                "openai", model, messages, temperature, max_tokens,
+                lambda: with_rate_limit("openai", estimate_tokens(messages, max_tokens, "openai", model), _send), kind=kind)
     except Exception as e:
         print(f"[OpenAI] 请求失败: {e}")
+        incr(f"llm.{kind}.failed")
         return None
 
 
@@ -74,12 +101,11 @@ def text_len(s: str) -> int:
 
 def fetch_html(url: str) -> str:
     try:
-        r = requests.get(url, headers={"User-Agent": UA}, timeout=30)
-        r.raise_for_status()
-        r.encoding = r.apparent_encoding or "utf-8"
-        return r.text
+        # 带 ETag/Last-Modified 条件请求；304 时直接返回本地缓存正文
+        return fetch_cached(url, headers={"User-Agent": UA}, timeout=30)
     except Exception as e:
         print(f"[抓取失败] {url}: {e}")
+        incr("fetch.failed")
         return ""
 
 
@@ -111,72 +137,9 @@ CANDIDATE_SELECTORS = [
 ]
 
 
-def _clean_node(node):
-    for bad in node.select("script,style,noscript,header,footer,nav,aside,form"):
-        bad.decompose()
-    return node
-
-
 def extract_main_text_and_images(soup: BeautifulSoup, base_url: str):
-    best_node, best_len = None, 0
-    for sel in CANDIDATE_SELECTORS:
-        for n in soup.select(sel):
-            node = _clean_node(n)
-            text = " ".join([p.get_text(" ", strip=True) for p in node.find_all("p")]) or node.get_text(" ", strip=True)
-            L = text_len(text)
-            if L > best_len:
-                best_len, best_node = L, node
-
-    if best_node is None:
-        paragraphs = soup.find_all("p")
-        text = " ".join([p.get_text(" ", strip=True) for p in paragraphs])
-        main_text = re.sub(r"\s+", " ", text).strip()
-        imgs = soup.find_all("img")
-    else:
-        text = " ".join([p.get_text(" ", strip=True) for p in best_node.find_all("p")]) or best_node.get_text(" ", strip=True)
-        main_text = re.sub(r"\s+", " ", text).strip()
-        imgs = best_node.find_all("img")
-
-    cover = None
-    og = soup.select_one('meta[property="og:image"]') or soup.select_one('meta[name="og:image"]')
-    if og and og.get("content"):
-        cover = og["content"].strip()
-
-    if not cover:
-        for im in imgs:
-            src = im.get("src") or im.get("data-src") or im.get("data-original")
-            if not src:
-                continue
-            full = urljoin(base_url, src)
-            if any(ext in full.lower() for ext in [".svg", ".ico", ".gif"]):
-                continue
-            cover = full
-            break
-
-    return main_text, cover
-
-
-def download_image(url: str, dest_dir: str):
-    try:
-        r = requests.get(url, headers={"User-Agent": UA}, timeout=30, stream=True)
-        r.raise_for_status()
-        ct = (r.headers.get("Content-Type") or "").lower()
-        ext = ".jpg"
-        if "png" in ct:
-            ext = ".png"
-        elif "jpeg" in ct:
-            ext = ".jpg"
-        elif "webp" in ct:
-            ext = ".webp"
-        fn = hashlib.md5(url.encode("utf-8")).hexdigest() + ext
-        fp = os.path.join(dest_dir, fn)
-        with open(fp, "wb") as f:
-            for chunk in r.iter_content(8192):
-                f.write(chunk)
-        return fn
-    except Exception as e:
-        print(f"[下载图片失败] {url}: {e}")
-        return None
+    # 单次遍历打分选出正文块，见 content_extract.py
+    return extract_main_and_cover(soup, base_url, CANDIDATE_SELECTORS)
 
 
 # ---------------- 读取爬虫结果 ----------------
@@ -217,12 +180,12 @@ def autodetect_latest_source():
 
 
 # ---------------- AI：摘要、排序、导语 ----------------
-def summarize_article(title: str, url: str, text: str, max_chars: int = 8000):
+def summarize_article(title: str, url: str, text: str, budget: int = PROMPT_BUDGET):
     """
     生成结构化中文摘要：高质量标题 + 3~5 要点 + 关键词
     仅基于正文，不得杜撰。
     """
-    text = text[:max_chars]
+    text = fit_body(text, title, provider="openai", model="gpt-4o-mini", budget=budget)
     prompt = f"""
 你是资深中文新闻编辑。仅基于我提供的【正文】，输出结构化摘要，禁止发挥与杜撰。
 输出格式：
@@ -240,7 +203,7 @@ def summarize_article(title: str, url: str, text: str, max_chars: int = 8000):
         {"role": "system", "content": "你是严谨、客观的中文新闻编辑。"},
         {"role": "user", "content": prompt},
     ]
-    return make_chat_request(messages, max_tokens=700)
+    return make_chat_request(messages, max_tokens=700, kind="summarize")
 
 
 def pick_top_articles(candidates, k=8):
@@ -258,19 +221,32 @@ def pick_top_articles(candidates, k=8):
         [{"role": "system", "content": "你是新闻价值判断助手。"},
          {"role": "user", "content": prompt}],
         max_tokens=200,
+        kind="pick_top",
     )
     if not out:
-        # 兜底：按正文长度排序时会处理，这里先全部索引
-        return list(range(min(k, len(candidates))))
+        return local_order(candidates, k)
     m = re.search(r"\[.*\]", out, re.S)
     if not m:
-        return list(range(min(k, len(candidates))))
+        return local_order(candidates, k)
     try:
         arr = json.loads(m.group(0))
         arr = [i for i in arr if isinstance(i, int) and 0 <= i < len(candidates)]
-        return arr[:k] if arr else list(range(min(k, len(candidates))))
+        return arr[:k] if arr else local_order(candidates, k)
     except Exception:
+        return local_order(candidates, k)
+
+
+def local_order(candidates, k):
+    """
+    本地 TF-IDF/中心度排序（ranker.py），用于 --local-rank 或 LLM 输出不可用时兜底；
+    未安装 numpy 时按原顺序取前 k 条。
+    """
+    try:
+        from ranker import rank
+    except ImportError:
         return list(range(min(k, len(candidates))))
+    with timed("rank"):
+        return rank([(c["title"], c.get("text") or c["lead"]) for c in candidates], k)
 
 
 def generate_overall_intro(news_titles):
@@ -280,95 +256,32 @@ def generate_overall_intro(news_titles):
         [{"role": "system", "content": "你是新闻导语撰写助手。"},
          {"role": "user", "content": prompt}],
         max_tokens=180,
+        kind="intro",
     ) or ""
 
 
 # ---------------- HTML 生成 ----------------
-def generate_html(cards, overall_intro, output_file):
-    """
-    cards: [{title, summary_html, summary_text, link, cover_rel}]
-    """
-    today = datetime.now().strftime("%Y-%m-%d")
-    css = """
-:root{
-  --bg:#0f172a; --panel:#111827; --fg:#e5e7eb;
-  --muted:#9ca3af; --brand:#60a5fa; --card:#0b1220;
+# 与 news_webgen 共用 renderer.py 的模板；这套配色对应原先写死在这里的深色样式
+DAILY_THEME = {
+    "style": "solid",
+    "palette": {"bg": "#0f172a", "surface": "#0b1220", "text": "#e5e7eb", "muted": "#9ca3af", "brand": "#60a5fa"},
+    "background": "linear-gradient(180deg,#0b1220,#0f172a)",
 }
-*{box-sizing:border-box}
-html,body{margin:0;padding:0;background:linear-gradient(180deg,#0b1220,#0f172a);color:var(--fg);font-family:system-ui,-apple-system,Segoe UI,Roboto,Helvetica,Arial}
-header{padding:24px 16px;text-align:center;position:sticky;top:0;background:rgba(11,18,32,.7);backdrop-filter:blur(8px);border-bottom:1px solid rgba(255,255,255,.06)}
-h1{margin:0;font-size:26px;letter-spacing:.5px}
-.container{max-width:1200px;margin:0 auto;padding:18px}
-.intro{background:rgba(96,165,250,.1);border:1px solid rgba(96,165,250,.25);padding:14px 16px;border-radius:12px;margin:16px 0;color:#dbeafe}
-.toolbar{display:flex;gap:12px;align-items:center;margin:14px 0 6px}
-input[type=search]{flex:1;padding:10px 12px;border-radius:10px;border:1px solid rgba(255,255,255,.12);background:#0b1324;color:var(--fg)}
-.grid{display:grid;grid-template-columns:repeat(auto-fill,minmax(280px,1fr));gap:16px;margin-top:12px}
-.card{background:var(--card);border:1px solid rgba(255,255,255,.06);border-radius:16px;overflow:hidden;box-shadow:0 6px 20px rgba(0,0,0,.3);display:flex;flex-direction:column}
-.cover{display:block;width:100%;aspect-ratio:16/9;object-fit:cover;background:#0a0f1c}
-.card-body{padding:14px 14px 16px}
-.card h2{font-size:18px;margin:0 0 8px;color:#e2e8f0;line-height:1.35}
-.meta{font-size:12px;color:var(--muted);margin-bottom:8px}
-.summary{font-size:14px;color:#d1d5db;line-height:1.6}
-.summary ul{margin:8px 0 0 18px;padding:0}
-a.button{display:inline-block;margin-top:10px;padding:8px 12px;background:var(--brand);color:#0b1220;text-decoration:none;border-radius:10px;font-weight:600}
-footer{text-align:center;color:var(--muted);padding:22px 0;margin-top:26px;border-top:1px solid rgba(255,255,255,.06)}
-"""
-    js = """
-function filterCards(ev){
-  const q = (ev.value||'').trim().toLowerCase();
-  document.querySelectorAll('.card').forEach(c=>{
-    const text = c.getAttribute('data-key') || '';
-    c.style.display = text.includes(q) ? '' : 'none';
-  });
-}
-"""
+DAILY_FOOTER = "由 OpenAI 驱动 · 自动摘要与页面生成"
 
-    html_parts = [
-        "<!DOCTYPE html>",
-        '<html lang="zh"><head>',
-        '<meta charset="utf-8" />',
-        '<meta name="viewport" content="width=device-width, initial-scale=1" />',
-        f"<title>每日新闻简报 - {today}</title>",
-        "<style>" + css + "</style>",
-        "<script>" + js + "</script>",
-        "</head><body>",
-        f"<header><h1>每日新闻简报 · {today}</h1></header>",
-        '<div class="container">',
-        '<div class="toolbar"><input type="search" placeholder="输入关键词筛选…" oninput="filterCards(this)" /></div>',
-        f'<div class="intro">{overall_intro or ""}</div>',
-        '<div class="grid">',
-    ]
 
-    def esc(s: str) -> str:
-        return (s or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-
-    for c in cards:
-        cover_tag = f'<img class="cover" src="assets/{esc(c.get("cover_rel",""))}" alt="cover" />' if c.get("cover_rel") else ""
-        key = (c.get("title", "") + " " + (c.get("summary_text", "") or "")).lower().replace('"', "'")
-        html_parts += [
-            f'<article class="card" data-key="{esc(key)}">',
-            cover_tag,
-            '<div class="card-body">',
-            f"<h2>{esc(c['title'])}</h2>",
-            f'<div class="meta"><a href="{esc(c["link"])}" target="_blank" rel="noopener">来源链接</a></div>',
-            f'<div class="summary">{c["summary_html"]}</div>',
-            f'<a class="button" href="{esc(c["link"])}" target="_blank" rel="noopener">阅读全文</a>',
-            "</div></article>",
-        ]
-
-    html_parts += [
-        "</div></div>",
-        "<footer>由 OpenAI 驱动 · 自动摘要与页面生成</footer>",
-        "</body></html>",
-    ]
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write("\n".join(html_parts))
+def generate_html(cards, overall_intro, output_file):
+    """cards: renderer.article_card 的结果（可为生成器）"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    render_page(output_file, cards, theme=DAILY_THEME, date=today, intro=overall_intro, footer=DAILY_FOOTER)
     print(f"✅ 页面已生成: {output_file}")
 
 
 # ---------------- 主流程 ----------------
 def main():
+    # --no-cache：不读写 LLM 缓存；--refresh：忽略已有缓存并覆盖
+    configure_llm_cache(enabled="--no-cache" not in sys.argv, refresh="--refresh" in sys.argv)
+
     # 1) 定位来源文件
     source_file = None
     if len(sys.argv) >= 3 and sys.argv[1] == "--source":
@@ -388,13 +301,16 @@ def main():
 
     # 2) 抓每篇文章正文 + 封面
     articles = []   # [{'url','title','text','cover'}]
-    for (txt, url) in pairs:
-        html = fetch_html(url)
+    htmls = fetch_all([u for _, u in pairs], fetch_html,
+                      workers=FETCH_WORKERS, per_host=FETCH_PER_HOST)
+    for (txt, url), html in zip(pairs, htmls):
         if not html:
             continue
-        soup = BeautifulSoup(html, "html.parser")
-        title = extract_title(soup, fallback=txt)
-        text, cover = extract_main_text_and_images(soup, url)
+        with timed("parse"):
+            soup = make_soup(html)
+        with timed("extract"):
+            title = extract_title(soup, fallback=txt)
+            text, cover = extract_main_text_and_images(soup, url)
         if text_len(text) < 150:   # 太短的正文通常无价值
             continue
         articles.append({"url": url, "title": title, "text": text, "cover": cover})
@@ -407,54 +323,29 @@ def main():
     candidates = []
     for a in articles:
         lead = (a["text"][:240] + "…") if len(a["text"]) > 240 else a["text"]
-        candidates.append({"title": a["title"], "lead": lead})
-
-    order = pick_top_articles(candidates, k=min(10, len(candidates)))
-    # 若模型输出不靠谱，可改为按正文长度排序：order = sorted(range(len(candidates)), key=lambda i: -text_len(articles[i]["text"]))[:min(10,len(candidates))]
-
-    # 4) 逐篇高质量摘要 + 下载封面
+        candidates.append({"title": a["title"], "lead": lead, "text": a["text"]})
+
+    k = min(10, len(candidates))
+    order = local_order(candidates, k) if "--local-rank" in sys.argv else pick_top_articles(candidates, k=k)
+
+    # 4) 并行高质量摘要（结果按 order 顺序） + 下载封面
+    summaries = map_ordered(
+        lambda i: summarize_article(articles[i]["title"], articles[i]["url"], articles[i]["text"]),
+        order, inflight=LLM_WORKERS)
+    # 封面并发下载，已下载过的不再请求
+    files = fetch_covers([articles[i]["cover"] for i in order], ASSET_DIR, headers={"User-Agent": UA})
+    renditions = process_covers(files.values(), ASSET_DIR)
     cards = []
-    for idx in order:
+    for idx, summary in zip(order, summaries):
         a = articles[idx]
-        summary = summarize_article(a["title"], a["url"], a["text"]) or ""
-        lines = [ln.strip() for ln in summary.splitlines() if ln.strip()]
-
-        nice_title = a["title"]
-        if lines and (len(lines[0]) <= 28) and ("•" not in lines[0]) and ("关键词" not in lines[0]):
-            nice_title = lines[0]
-            lines = lines[1:]
-
-        bullets = [ln[1:].strip() if ln.startswith("•") else ln for ln in lines if ln.startswith("•")]
-        other = [ln for ln in lines if (not ln.startswith("•")) and (not ln.startswith("关键词"))]
-        kw = ""
-        for ln in lines:
-            if ln.startswith("关键词"):
-                kw = ln
-
-        if bullets:
-            bullet_html = "<ul>" + "".join([f"<li>{b}</li>" for b in bullets]) + "</ul>"
-        else:
-            bullet_html = f"<p>{' '.join(other)}</p>" if other else ""
-
-        summary_html = bullet_html + (f"<p style='color:#9ca3af;font-size:12px;margin-top:6px'>{kw}</p>" if kw else "")
-        cover_rel = None
-        if a.get("cover"):
-            fn = download_image(a["cover"], ASSET_DIR)
-            if fn:
-                cover_rel = fn
-
-        cards.append({
-            "title": nice_title,
-            "summary_html": summary_html or "<p>（暂无摘要）</p>",
-            "summary_text": summary,
-            "link": a["url"],
-            "cover_rel": cover_rel,
-        })
+        record = {"title": a["title"], "link": a["url"], "site": urlparse(a["url"]).netloc, "raw_summary": summary}
+        cards.append(article_card(record, files.get(a.get("cover")), renditions, title_from_summary=True))
 
     # 5) 总导语 + 写 HTML
     overall_intro = generate_overall_intro([c["title"] for c in cards]) or ""
     out_file = os.path.join(PAGE_DIR, "daily_news.html")
     generate_html(cards, overall_intro, out_file)
+    write_report(os.path.join("code", REPORT_NAME))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+dedup.py
+近似重复新闻聚类（同一事件被首页以不同 URL/标题多次链接）：
+- 正文去空白/标点后取 5 字 shingle，按码点多项式哈希（NumPy 滑窗计算，跨进程、跨天稳定）
+- MinHash 签名（NumPy 向量化，NUM_PERM 个置换）
+- LSH 分桶（BANDS × ROWS）只比较同桶候选，不做两两比较；估计 Jaccard ≥ THRESHOLD 视为重复
+- 并查集合并成簇，每簇只保留一个代表（order 最小的，即输入顺序最靠前的）去做摘要
+签名存进 article_store，前几天的文章也能参与比对。
+用法：
+  from dedup import DedupIndex, signature
+  index = DedupIndex()
+  rep = index.add(url, signature(body), order=i)   # 与已有文章重复时返回代表的 key，否则 None
+依赖：numpy
+"""
+import re
+import threading
+import numpy as np
+
+SHINGLE = 5
+NUM_PERM = 128
+BANDS, ROWS = 16, 8       # BANDS * ROWS == NUM_PERM；LSH 阈值约 (1/BANDS)^(1/ROWS) ≈ 0.71
+THRESHOLD = 0.7
+HISTORY_DAYS = 3
+
+_PRIME = np.uint64(4294967311)   # 大于 2^32 的素数；a, x < 2^32 时 a*x+b 不会溢出 uint64
+_rng = np.random.RandomState(20240501)
+_A = _rng.randint(1, 2 ** 32 - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 2 ** 32 - 1, size=NUM_PERM, dtype=np.uint64)
+_NOISE = re.compile(r"[\s\W_]+", re.U)
+
+
+def shingle_hashes(text, k=SHINGLE):
+    """所有 k 字 shingle 的 32 位哈希（去重后）。"""
+    s = _NOISE.sub("", (text or "").lower())
+    if not s:
+        return np.zeros(0, dtype=np.uint64)
+    cp = np.frombuffer(s.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    m = max(1, len(cp) - k + 1)
+    h = np.zeros(m, dtype=np.uint64)
+    for j in range(min(k, len(cp))):
+        h = (h * np.uint64(1000003) + cp[j:j + m]) & np.uint64(0xFFFFFFFF)
+    return np.unique(h)
+
+
+def signature(text):
+    """返回 uint32 的 MinHash 签名（长度 NUM_PERM）；空文本返回全 0xFFFFFFFF。"""
+    x = shingle_hashes(text)
+    if not len(x):
+        return np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+    hashed = (_A[:, None] * x[None, :] + _B[:, None]) % _PRIME
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+    """两个签名的 Jaccard 估计。"""
+    return float(np.mean(sig_a == sig_b))
+
+
+def to_bytes(sig):
+    return np.asarray(sig, dtype=np.uint32).tobytes()
+
+
+def from_bytes(blob):
+    return np.frombuffer(blob, dtype=np.uint32)
+
+
+class DedupIndex:
+    """LSH 分桶 + 并查集；线程安全，可边流入边去重。"""
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self._sigs, self._parent, self._order = {}, {}, {}
+        self._claimed = set()     # 本次已选出代表的簇（存根节点）
+        self._buckets = [dict() for _ in range(BANDS)]
+        self._lock = threading.Lock()
+
+    def _find(self, key):
+        while self._parent[key] != key:
+            self._parent[key] = self._parent[self._parent[key]]
+            key = self._parent[key]
+        return key
+
+    def _union(self, a, b):
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            # order 小的一方做代表
+            if self._order[rb] < self._order[ra]:
+                ra, rb = rb, ra
+            self._parent[rb] = ra
+            if rb in self._claimed:
+                self._claimed.discard(rb)
+                self._claimed.add(ra)
+
+    def add(self, key, sig, order=None):
+        """加入一篇文章；与已有文章近似重复时返回所在簇的代表 key，否则返回 None。
+        order 决定谁做代表（小的优先，一般传输入下标），缺省按加入先后。"""
+        sig = np.asarray(sig, dtype=np.uint32)
+        bands = [sig[b * ROWS:(b + 1) * ROWS].tobytes() for b in range(BANDS)]
+        with self._lock:
+            cands = set()
+            for b, h in enumerate(bands):
+                cands.update(self._buckets[b].get(h, ()))
+            cands.discard(key)
+            matches = [c for c in cands if similarity(sig, self._sigs[c]) >= self.threshold]
+            old = self._sigs.get(key)
+            if old is None:
+                self._parent[key] = key
+                self._order[key] = len(self._order) if order is None else order
+            elif not np.array_equal(old, sig):
+                # 同一 key 正文改了（如历史文章今天被编辑）：从旧桶移出，按新签名重新分桶
+                for b in range(BANDS):
+                    h = old[b * ROWS:(b + 1) * ROWS].tobytes()
+                    self._buckets[b][h].remove(key)
+                    if not self._buckets[b][h]:
+                        del self._buckets[b][h]
+            if old is None or not np.array_equal(old, sig):
+                for b, h in enumerate(bands):
+                    self._buckets[b].setdefault(h, []).append(key)
+            self._sigs[key] = sig
+            for c in matches:
+                self._union(c, key)
+            return self._find(key) if matches else None
+
+    def claim(self, key):
+        """把 key 所在的簇标记为“已有文章入选”；该簇之前已被标记时返回 False。"""
+        with self._lock:
+            root = self._find(key)
+            if root in self._claimed:
+                return False
+            self._claimed.add(root)
+            return True
+
+    def find(self, key):
+        """key 所在簇的代表。"""
+        with self._lock:
+            return self._find(key)
+
+    def clusters(self):
+        """返回 {代表 key: [成员 key, ...]}（只含 2 篇以上的簇）。"""
+        with self._lock:
+            groups = {}
+            for key in self._sigs:
+                groups.setdefault(self._find(key), []).append(key)
+        return {rep: members for rep, members in groups.items() if len(members) > 1}
+
+
+def cluster(texts, threshold=THRESHOLD):
+    """离线批量聚类：返回与 texts 等长的簇标签（代表的下标）。"""
+    index = DedupIndex(threshold)
+    for i, text in enumerate(texts):
+        index.add(i, signature(text), order=i)
+    return [index.find(i) for i in range(len(texts))]
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+extract_pool.py
+解析/抽取阶段：把原始 HTML 送进进程池，子进程内建树并抽取，只回传小的 (title, body, cover) 记录，
+绕开 GIL，让解析吃满多核。少量网页时直接在本进程解析，省去进程启动开销。
+进程池在第一次提交时才创建；预计网页数少于 MIN_POOL_JOBS 或 workers<=1 时不建池。
+用法（流式流水线中按批提交）：
+  with ExtractPool(workers=4, expected=len(pairs)) as pool:
+      records = pool([(html, url, anchor_text), ...])   # 返回与输入顺序一致的 [(title, body, cover)]
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from content_extract import parse_article, CANDIDATE
+from metrics import merge, incr
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_CHUNKSIZE = 4     # 每批提交的网页数
+DEFAULT_LINGER = 0.02     # 流水线里凑满一批的最长等待（秒）
+MIN_POOL_JOBS = 24        # 少于这个数量时不启用进程池
+
+
+def _parse_job(job, selectors=CANDIDATE):
+    """返回 ((title, body, cover), 耗时 dict)；子进程里的统计随结果带回主进程合并，失败时耗时为 None。"""
+    html, url, fallback = job
+    timings = {}
+    try:
+        return parse_article(html, url, fallback=fallback, selectors=selectors, timings=timings), timings
+    except Exception as e:
+        print(f"[解析失败] {url}: {e}")
+        return (fallback or "未命名标题", "", None), None
+
+
+def _parse_batch(jobs, selectors=CANDIDATE):
+    return [_parse_job(j, selectors) for j in jobs]
+
+
+def _collect(results):
+    records = []
+    for rec, timings in results:
+        if timings is None:
+            incr("parse.failed")
+        else:
+            merge(timings)
+        records.append(rec)
+    return records
+
+
+class ExtractPool:
+    """流水线用：每次把一批网页提交到进程池。expected 为预计网页总数，少于 MIN_POOL_JOBS 时在本进程解析。"""
+    def __init__(self, workers=DEFAULT_WORKERS, selectors=CANDIDATE, expected=None):
+        self.selectors = selectors
+        self.workers = workers if expected is None else min(workers, expected)
+        self.inline = workers <= 1 or (expected is not None and expected < MIN_POOL_JOBS)
+        self._pool, self._lock = None, threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def __call__(self, jobs):
+        if self.inline:
+            return _collect(_parse_batch(jobs, self.selectors))
+        return _collect(self._executor().submit(_parse_batch, jobs, self.selectors).result())
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
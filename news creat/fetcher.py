@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+fetcher.py
+并发抓取阶段：线程池 + 全局并发上限 + 每个站点（host）并发上限，结果按输入顺序返回。
+news_analyzer.py 与 daily_news_generator.py 共用。
+用法：
+  from fetcher import fetch_all
+  htmls = fetch_all(urls, fetch_html, workers=8, per_host=4)
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+DEFAULT_WORKERS = 8     # 全局同时在途的请求数
+DEFAULT_PER_HOST = 4    # 同一 host 同时在途的请求数
+DEFAULT_DELAY = 0.0     # 同一 host 相邻两次请求的最小间隔（秒），爬取首页时用于礼貌访问
+
+
+def host_of(url):
+    return (urlparse(url).netloc or "").lower()
+
+
+class HostLimiter:
+    """按 host 分配信号量，限制同一站点的并发；可选地保证相邻请求间隔 delay 秒。"""
+    def __init__(self, per_host=DEFAULT_PER_HOST, delay=DEFAULT_DELAY):
+        self.per_host = max(1, int(per_host))
+        self.delay = max(0.0, float(delay))
+        self._lock = threading.Lock()
+        self._sems = {}
+        self._next = {}   # host -> 下一次允许发起请求的时间
+
+    def slot(self, url):
+        host = host_of(url)
+        with self._lock:
+            sem = self._sems.get(host)
+            if sem is None:
+                sem = self._sems[host] = threading.BoundedSemaphore(self.per_host)
+        return sem
+
+    def wait_turn(self, url):
+        if not self.delay:
+            return
+        host = host_of(url)
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, 0.0))
+            self._next[host] = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+
+def _interleave_by_host(urls):
+    """按 host 轮转排列下标，避免同一站点的请求扎堆占满线程池。"""
+    groups = {}
+    for i, u in enumerate(urls):
+        groups.setdefault(host_of(u), []).append(i)
+    order, queues = [], list(groups.values())
+    while queues:
+        nxt = []
+        for q in queues:
+            order.append(q.pop(0))
+            if q:
+                nxt.append(q)
+        queues = nxt
+    return order
+
+
+def fetch_all(urls, fetch, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST, delay=DEFAULT_DELAY):
+    """
+    并发执行 fetch(url)，返回与 urls 一一对应、顺序一致的结果列表。
+    fetch 自行处理异常（如 fetch_html 失败返回 ""）；未捕获的异常会原样抛出。
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+    limiter = HostLimiter(per_host, delay)
+
+    def _one(url):
+        with limiter.slot(url):
+            limiter.wait_turn(url)
+            return fetch(url)
+
+    order = _interleave_by_host(urls)
+    results = [None] * len(urls)
+    with ThreadPoolExecutor(max_workers=max(1, min(int(workers), len(urls)))) as ex:
+        futures = [(i, ex.submit(_one, urls[i])) for i in order]
+        for i, fut in futures:
+            results[i] = fut.result()
+    return results
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+html_backend.py
+HTML 解析后端：优先使用 C 加速的 lxml 树构建器，未安装时回退到纯 Python 的 html.parser。
+可用环境变量 NEWS_HTML_PARSER 强制指定（lxml / html.parser / html5lib）。
+一致性检查（同一批网页在各后端下的标题/正文/首图是否一致）：
+  python html_backend.py --corpus code/cache/pages
+  # corpus 目录可放 *.html（文件名无关），或直接用 page_cache 缓存的 *.json
+依赖：beautifulsoup4（可选 lxml）
+"""
+import os
+import sys
+import json
+import glob
+import argparse
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+PREFERRED = ["lxml", "html.parser"]
+
+
+def available_backends():
+    return [name for name in ("lxml", "html5lib", "html.parser") if builder_registry.lookup(name)]
+
+
+def default_backend():
+    forced = os.getenv("NEWS_HTML_PARSER")
+    if forced and builder_registry.lookup(forced):
+        return forced
+    for name in PREFERRED:
+        if builder_registry.lookup(name):
+            return name
+    return "html.parser"
+
+
+def make_soup(html, backend=None):
+    return BeautifulSoup(html, backend or default_backend())
+
+
+def load_corpus(path):
+    """返回 [(url, html)]：*.html 以文件路径作为 url，*.json 读取 page_cache 的 url/body。"""
+    pages = []
+    for fp in sorted(glob.glob(os.path.join(path, "*.html")) + glob.glob(os.path.join(path, "*.htm"))):
+        with open(fp, "r", encoding="utf-8", errors="replace") as f:
+            pages.append(("file:///" + os.path.abspath(fp).replace(os.sep, "/"), f.read()))
+    for fp in sorted(glob.glob(os.path.join(path, "*.json"))):
+        try:
+            with open(fp, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if entry.get("body"):
+            pages.append((entry.get("final_url") or entry.get("url") or fp, entry["body"]))
+    return pages
+
+
+def check_parity(pages, backends=None):
+    """对每个网页比较各后端的 (title, body, cover)，返回不一致列表 [(url, {backend: record})]。"""
+    from content_extract import parse_article
+    backends = backends or available_backends()
+    mismatches = []
+    for url, html in pages:
+        records = {b: parse_article(html, url, backend=b) for b in backends}
+        if len(set(records.values())) > 1:
+            mismatches.append((url, records))
+    return mismatches
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", type=str, default=os.path.join("code", "cache", "pages"))
+    ap.add_argument("--backends", type=str, default=None, help="逗号分隔，默认所有已安装的后端")
+    args = ap.parse_args()
+
+    backends = args.backends.split(",") if args.backends else available_backends()
+    pages = load_corpus(args.corpus)
+    print(f"[后端] {', '.join(backends)}（默认：{default_backend()}）；网页 {len(pages)} 个")
+    mismatches = check_parity(pages, backends)
+    for url, records in mismatches:
+        print(f"[不一致] {url}")
+        for b, (title, body, cover) in records.items():
+            print(f"  {b:12s} 标题={title[:30]!r} 正文长度={len(body)} 首图={cover}")
+    print(f"[OK] 一致 {len(pages) - len(mismatches)} / {len(pages)}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
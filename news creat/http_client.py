@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+http_client.py
+全项目共用的 HTTP 会话层：
+- 一个 requests.Session，按 host 维护连接池并保持 keep-alive（bbc.com / ichef.bbci.co.uk / api.openai.com 复用连接）
+- 连接池大小可配置（环境变量 NEWS_HTTP_POOL 或 configure(pool_size=...)），应不小于并发抓取数
+- 幂等请求（GET/HEAD）遇连接错误或 5xx/429 时按带抖动的指数退避重试；POST 不自动重试
+用法：
+  from http_client import http_get, http_post
+  r = http_get(url, headers={"User-Agent": UA}, timeout=30)
+"""
+import os
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_SIZE = int(os.getenv("NEWS_HTTP_POOL", "16"))
+GET_RETRIES = 3
+BACKOFF = 0.5   # 退避基数（秒）：0.5, 1, 2 ... 再乘以 0.5~1.5 的随机抖动
+
+_settings = {"pool_size": POOL_SIZE, "retries": GET_RETRIES, "backoff": BACKOFF}
+_session, _session_lock = None, threading.Lock()
+
+
+class _JitterRetry(Retry):
+    """在 urllib3 的指数退避上叠加随机抖动，避免多线程同时重试。"""
+    def get_backoff_time(self):
+        base = super().get_backoff_time()
+        return base * random.uniform(0.5, 1.5) if base else 0
+
+
+def configure(pool_size=None, retries=None, backoff=None):
+    """修改配置后，下一次请求会重建会话。"""
+    global _session
+    for k, v in (("pool_size", pool_size), ("retries", retries), ("backoff", backoff)):
+        if v is not None:
+            _settings[k] = v
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _build_session():
+    retry = _JitterRetry(
+        total=_settings["retries"], connect=_settings["retries"], read=_settings["retries"],
+        status=_settings["retries"], backoff_factor=_settings["backoff"],
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=_settings["pool_size"],
+                          pool_maxsize=_settings["pool_size"], max_retries=retry)
+    s = requests.Session()
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def http_get(url, **kwargs):
+    return get_session().get(url, **kwargs)
+
+
+def http_post(url, **kwargs):
+    return get_session().post(url, **kwargs)
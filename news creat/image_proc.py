@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+image_proc.py
+封面图处理：下载后的原图裁成 16:9，缩放到固定宽度（400 / 800 px）并转成 WebP，
+卡片用 srcset + loading="lazy" 引用，页面不再直接加载多 MB 的原图。
+- 在进程池里处理（Pillow 解码/缩放是 CPU 密集型）
+- 结果按原图文件名缓存（assets.py 的文件名即内容哈希），原图不变就不重复处理
+- 未安装 Pillow 时跳过，页面沿用原图
+用法：
+  from image_proc import process_covers, srcset_attrs
+  rends = process_covers(["ab12….jpg", ...], asset_dir)     # {原图文件名: [(宽度, 文件名), ...]}
+  attrs = srcset_attrs("ab12….jpg", rends, prefix="assets/")
+依赖：Pillow（可选）
+"""
+import os
+import json
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from metrics import timed, incr
+
+WIDTHS = (400, 800)
+RATIO = 16 / 9
+QUALITY = 75
+MANIFEST_NAME = "renditions.json"
+SIZES = "(max-width: 640px) 100vw, 400px"   # 卡片最小宽度 280px，多列时约 400px 宽
+MIN_POOL_JOBS = 3                            # 少于这个数量时在本进程处理
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+
+def available():
+    return Image is not None
+
+
+def _render(src_path, out_dir, widths=WIDTHS, quality=QUALITY):
+    """处理一张图，返回 [(宽度, 文件名)]；不放大，原图比最小宽度还窄时只出一张原宽的。"""
+    stem = os.path.splitext(os.path.basename(src_path))[0]
+    with Image.open(src_path) as im:
+        im = ImageOps.exif_transpose(im)
+        im = im.convert("RGBA" if im.mode in ("RGBA", "LA", "P") else "RGB")
+        targets = [w for w in widths if w <= im.width] or [im.width]
+        out = []
+        for w in targets:
+            fn = f"{stem}_{w}.webp"
+            tile = ImageOps.fit(im, (w, max(1, round(w / RATIO))), Image.LANCZOS)
+            fd, tmp = tempfile.mkstemp(dir=out_dir, suffix=".part")
+            with os.fdopen(fd, "wb") as f:
+                tile.save(f, "WEBP", quality=quality, method=4)
+            os.replace(tmp, os.path.join(out_dir, fn))
+            out.append((w, fn))
+    return out
+
+
+def _job(args):
+    src_path, out_dir = args
+    try:
+        return _render(src_path, out_dir)
+    except Exception as e:
+        print(f"[图片处理失败] {src_path}: {e}")
+        return None
+
+
+def _load_manifest(asset_dir):
+    try:
+        with open(os.path.join(asset_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(asset_dir, manifest):
+    fd, tmp = tempfile.mkstemp(dir=asset_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(asset_dir, MANIFEST_NAME))
+
+
+def process_covers(files, asset_dir, workers=None):
+    """files: asset_dir 下的原图文件名；返回 {原图文件名: [(宽度, 文件名), ...]}，未安装 Pillow 时返回 {}。"""
+    if not available():
+        return {}
+    manifest = _load_manifest(asset_dir)
+    files = list(dict.fromkeys(f for f in files if f))
+
+    def _cached(fn):
+        rends = manifest.get(fn)
+        return rends and all(os.path.exists(os.path.join(asset_dir, r)) for _, r in rends)
+
+    result = {fn: [tuple(r) for r in manifest[fn]] for fn in files if _cached(fn)}
+    todo = [fn for fn in files if fn not in result]
+    incr("image_proc.cached", len(result))
+    if todo:
+        jobs = [(os.path.join(asset_dir, fn), asset_dir) for fn in todo]
+        with timed("image_proc"):
+            if len(jobs) < MIN_POOL_JOBS or workers == 1:
+                outs = [_job(j) for j in jobs]
+            else:
+                with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(jobs))) as ex:
+                    outs = list(ex.map(_job, jobs))
+        for fn, rends in zip(todo, outs):
+            if rends:
+                result[fn] = manifest[fn] = rends
+                src = os.path.getsize(os.path.join(asset_dir, fn))
+                largest = os.path.getsize(os.path.join(asset_dir, rends[-1][1]))
+                incr("image_proc.bytes_saved", max(0, src - largest))
+        _save_manifest(asset_dir, manifest)
+    return result
+
+
+def srcset_attrs(fn, renditions, prefix="assets/"):
+    """返回 <img> 的 src/srcset/sizes 属性串；没有可用缩略图时只给原图。"""
+    rends = renditions.get(fn)
+    if not rends:
+        return f"src='{prefix}{fn}'"
+    srcset = ", ".join(f"{prefix}{r} {w}w" for w, r in rends)
+    return f"src='{prefix}{rends[0][1]}' srcset='{srcset}' sizes='{SIZES}'"
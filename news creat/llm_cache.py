@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+llm_cache.py
+LLM 补全结果的本地持久缓存（SQLite）：
+- 键：provider + model + messages + temperature + max_tokens 的 sha256（内容寻址）
+- 过期：TTL 秒数，过期条目读取时删除
+- 容量：总字节数超过上限时按最近访问时间（LRU）淘汰
+用法：
+  from llm_cache import cached_completion, configure
+  configure(enabled=not args.no_cache, refresh=args.refresh)
+  text = cached_completion(provider, model, messages, temperature, max_tokens, call)
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from metrics import incr
+
+CACHE_PATH = os.path.join("code", "cache", "llm_cache.sqlite")
+DEFAULT_TTL = 7 * 24 * 3600          # 7 天
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+
+_settings = {"enabled": True, "refresh": False, "ttl": DEFAULT_TTL,
+             "max_bytes": DEFAULT_MAX_BYTES, "path": CACHE_PATH}
+_cache, _cache_lock = None, threading.Lock()
+
+
+def configure(enabled=None, refresh=None, ttl=None, max_bytes=None, path=None):
+    """enabled=False 等价于 --no-cache（不读不写）；refresh=True 等价于 --refresh（不读，只写）。"""
+    global _cache
+    for k, v in (("enabled", enabled), ("refresh", refresh), ("ttl", ttl),
+                 ("max_bytes", max_bytes), ("path", path)):
+        if v is not None:
+            _settings[k] = v
+    with _cache_lock:
+        if _cache is not None and _cache.path != _settings["path"]:
+            _cache.close()
+            _cache = None
+
+
+def make_key(provider, model, messages, temperature, max_tokens):
+    raw = json.dumps([provider, model, messages, temperature, max_tokens],
+                     ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    def __init__(self, path, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path, self.ttl, self.max_bytes = path, ttl, max_bytes
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS completions(
+            key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,
+            created REAL NOT NULL, accessed REAL NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON completions(accessed)")
+        self._db.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM completions WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl and now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM completions WHERE key=?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE completions SET accessed=? WHERE key=?", (now, key))
+            self._db.commit()
+            return row[0]
+
+    def put(self, key, value):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO completions VALUES(?,?,?,?,?)",
+                             (key, value, size, now, now))
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size),0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute(
+                "SELECT key, size FROM completions ORDER BY accessed ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM completions WHERE key=?", (key,))
+            total -= size
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CompletionCache(_settings["path"], _settings["ttl"], _settings["max_bytes"])
+        _cache.ttl, _cache.max_bytes = _settings["ttl"], _settings["max_bytes"]
+        return _cache
+
+
+def cached_completion(provider, model, messages, temperature, max_tokens, call, kind="chat"):
+    """命中则直接返回缓存内容；否则执行 call() 并写入缓存（None/空结果不缓存）。kind 仅用于统计。"""
+    if not _settings["enabled"]:
+        return call()
+    cache = get_cache()
+    key = make_key(provider, model, messages, temperature, max_tokens)
+    if not _settings["refresh"]:
+        hit = cache.get(key)
+        if hit is not None:
+            incr(f"llm.{kind}.cache_hit")
+            return hit
+    out = call()
+    if out:
+        cache.put(key, out)
+    return out
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+llm_scheduler.py
+LLM 调用调度：
+- 有界并发：map_ordered 以固定在途数并行执行，结果按输入顺序返回（输出确定）
+- 每分钟 token 预算：按 provider（openai / deepseek）分别计数，超额时等待
+- 遇 HTTP 429：按 Retry-After 退避重试，同一 provider 的其它请求一并暂停
+用法：
+  content = with_rate_limit("openai", estimate_tokens(messages, 700, "openai", "gpt-4o-mini"), lambda: post(...))
+  results = map_ordered(fn, items, inflight=4)
+"""
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+from prompt_budget import count_tokens
+
+DEFAULT_INFLIGHT = 4
+MAX_RETRIES = 5
+# 每分钟 token 预算（按账号等级调整）
+TPM_BUDGET = {"openai": 200000, "deepseek": 1000000}
+
+def estimate_tokens(messages, max_tokens=0, provider="openai", model=None):
+    """粗估一次请求消耗的 token：各条消息按 prompt_budget.count_tokens（与正文裁剪同一套费率）计，再加上输出上限。"""
+    total = sum(count_tokens(m.get("content") or "", provider, model) + 4 for m in messages or [])
+    return total + int(max_tokens or 0)
+
+
+class TokenBudget:
+    """60 秒滑动窗口内的 token 计数；429 时整体暂停到 blocked_until。"""
+    def __init__(self, tpm):
+        self.tpm = int(tpm)
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._window = []   # [(ts, tokens)]
+
+    def acquire(self, tokens):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._window = [(t, n) for t, n in self._window if now - t < 60]
+                used = sum(n for _, n in self._window)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif used + tokens <= self.tpm or not self._window:
+                    self._window.append((now, tokens))
+                    return
+                else:
+                    wait = self._window[0][0] + 60 - now
+            time.sleep(max(wait, 0.05))
+
+    def pause(self, seconds):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+_budgets, _budgets_lock = {}, threading.Lock()
+
+
+def budget_for(provider):
+    with _budgets_lock:
+        b = _budgets.get(provider)
+        if b is None:
+            b = _budgets[provider] = TokenBudget(TPM_BUDGET.get(provider, TPM_BUDGET["openai"]))
+        return b
+
+
+def set_budget(provider, tpm):
+    """调整某个 provider 的每分钟 token 预算（已创建的计数器同步生效）。"""
+    with _budgets_lock:
+        TPM_BUDGET[provider] = int(tpm)
+        if provider in _budgets:
+            _budgets[provider].tpm = int(tpm)
+
+
+def _retry_after(resp, attempt):
+    val = (resp.headers.get("Retry-After") or "").strip() if resp is not None else ""
+    if val:
+        try:
+            return max(0.0, float(val))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(val).timestamp() - time.time())
+            except Exception:
+                pass
+    return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+
+def is_rate_limited(exc):
+    resp = getattr(exc, "response", None)
+    return resp is not None and getattr(resp, "status_code", None) == 429
+
+
+def with_rate_limit(provider, tokens, send, retries=MAX_RETRIES):
+    """
+    在 provider 的 token 预算内执行 send()；send 抛出 429（requests.HTTPError）时退避重试。
+    其它异常原样抛出。
+    """
+    budget = budget_for(provider)
+    for attempt in range(retries + 1):
+        budget.acquire(tokens)
+        try:
+            return send()
+        except Exception as e:
+            if not is_rate_limited(e) or attempt >= retries:
+                raise
+            wait = _retry_after(e.response, attempt)
+            print(f"[限流] {provider} 429，{wait:.1f}s 后重试（第 {attempt + 1} 次）")
+            budget.pause(wait)
+
+
+def map_ordered(fn, items, inflight=DEFAULT_INFLIGHT):
+    """以最多 inflight 个并发执行 fn(item)，返回顺序与 items 一致。"""
+    items = list(items)
+    if not items:
+        return []
+    if inflight <= 1 or len(items) == 1:
+        return [fn(it) for it in items]
+    with ThreadPoolExecutor(max_workers=min(int(inflight), len(items))) as ex:
+        return list(ex.map(fn, items))
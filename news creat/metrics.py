@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+metrics.py
+轻量的计时与计数（线程安全），用于统计每日流水线各阶段耗时：
+- 计时：抓取 fetch、解析 parse、正文抽取 extract、LLM 调用 llm.<类型>、下载图片 download_image、渲染 render
+- 计数：传输字节数、LLM prompt/completion token、缓存命中、失败次数
+运行结束写出 JSON 报告（默认与 news_data.json 同目录的 run_report.json）。
+用法：
+  with timed("fetch"): ...
+  incr("fetch.bytes", len(body))
+  write_report(os.path.join("code", "run_report.json"))
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+REPORT_NAME = "run_report.json"
+
+_lock = threading.Lock()
+_timers = {}     # name -> [次数, 总秒数, 最大秒数]
+_counters = {}   # name -> 数值
+_started = time.time()
+
+
+def record(name, seconds):
+    with _lock:
+        t = _timers.setdefault(name, [0, 0.0, 0.0])
+        t[0] += 1
+        t[1] += seconds
+        t[2] = max(t[2], seconds)
+
+
+def incr(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+@contextmanager
+def timed(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0)
+
+
+def merge(timings):
+    """合并子进程带回的计时：{name: 秒数}。"""
+    for name, seconds in (timings or {}).items():
+        record(name, seconds)
+
+
+def reset():
+    global _started
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _started = time.time()
+
+
+def snapshot():
+    with _lock:
+        timers = {name: {"count": c, "total_s": round(total, 4),
+                         "avg_s": round(total / c, 4) if c else 0.0, "max_s": round(mx, 4)}
+                  for name, (c, total, mx) in sorted(_timers.items())}
+        counters = dict(sorted(_counters.items()))
+    return {"started": datetime.fromtimestamp(_started).isoformat(timespec="seconds"),
+            "wall_s": round(time.time() - _started, 3),
+            "timers": timers, "counters": counters}
+
+
+def write_report(path, extra=None, merge_existing=False):
+    """
+    写出运行报告。merge_existing=True 时与已有报告合并（同名阶段以本次为准），
+    便于单独运行 news_webgen.py 时把渲染阶段追加到分析阶段的报告里。
+    """
+    report = snapshot()
+    if merge_existing and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                old = json.load(f)
+            for key in ("timers", "counters"):
+                report[key] = {**old.get(key, {}), **report[key]}
+        except (OSError, ValueError):
+            pass
+    if extra:
+        report.update(extra)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
@@ -9,17 +9,34 @@ news_analyzer.py
 用法：
   python news_analyzer.py --source code\result_with_linksXX.txt --out code\news_data.json --provider openai
   # provider: openai | deepseek（默认 openai）
-依赖：requests beautifulsoup4
+  # LLM 结果缓存在 code/cache/llm_cache.sqlite；--no-cache 不读写缓存，--refresh 强制重新请求
+依赖：requests beautifulsoup4（可选 lxml，安装后自动用作解析后端）
 """
 import os, re, json, glob, argparse, hashlib
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
-import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from fetcher import HostLimiter, DEFAULT_WORKERS, DEFAULT_PER_HOST
+from llm_scheduler import with_rate_limit, estimate_tokens, DEFAULT_INFLIGHT
+from llm_cache import cached_completion, configure as configure_llm_cache
+from page_cache import fetch_cached
+from http_client import http_post
+from article_store import ArticleStore, content_hash, normalize_url
+from extract_pool import ExtractPool, DEFAULT_WORKERS as EXTRACT_WORKERS, DEFAULT_CHUNKSIZE, DEFAULT_LINGER
+from pipeline import run_pipeline, Stage, DEFAULT_QUEUE_SIZE
+from metrics import timed, incr, write_report, REPORT_NAME
+from prompt_budget import fit_body, count_tokens, DEFAULT_BUDGET as PROMPT_BUDGET
 
 UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
       "(KHTML, like Gecko) Chrome/123.0 Safari/537.36")
 REQUEST_TIMEOUT = 45
+SUMMARY_BATCH = 4          # 一次请求最多打包的短文章数（1 为逐篇请求）
+BATCH_ARTICLE_TOKENS = 600 # 正文不超过该 token 数的文章才参与打包
+RANK_MODE = "hybrid"       # llm：LLM 选题；local：本地 ranker 选题；hybrid：本地预筛 + LLM 选题
+SHORTLIST = 30             # local/hybrid 下候选超过该数时，只摘要本地排名前 N 篇
+# 接口地址可用环境变量覆盖（自建代理、离线基准 bench.py 的本地桩服务器）
+API_BASE = {"openai": os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+            "deepseek": os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1")}
 
 def autodetect_latest_source():
     cand = sorted(glob.glob(os.path.join("code","result_with_links*.txt")),
@@ -48,98 +65,61 @@ def load_pairs(path):
 
 def fetch_html(url):
     try:
-        r = requests.get(url, headers={"User-Agent": UA}, timeout=30)
-        r.raise_for_status()
-        r.encoding = r.apparent_encoding or "utf-8"
-        return r.text
+        # 带 ETag/Last-Modified 条件请求；304 时直接返回本地缓存正文
+        return fetch_cached(url, headers={"User-Agent": UA}, timeout=30)
     except Exception as e:
         print(f"[抓取失败] {url}: {e}")
+        incr("fetch.failed")
         return ""
 
-def extract_title(soup, fallback=""):
-    og = soup.select_one('meta[property="og:title"]') or soup.select_one('meta[name="og:title"]')
-    if og and og.get("content"):
-        return og["content"].strip()
-    h1 = soup.find("h1")
-    if h1 and h1.get_text(strip=True):
-        return h1.get_text(strip=True)
-    if soup.title and soup.title.string:
-        return soup.title.string.strip()
-    return fallback or "未命名标题"
-
-CANDIDATE = [
-    "article",".article",".post",".entry-content",".article-content",
-    "#content",".content","#main",".main",".news"
-]
-
-def _clean(node):
-    for bad in node.select("script,style,noscript,header,footer,nav,aside,form"):
-        bad.decompose()
-    return node
-
-def text_len(s): 
-    import re
-    return len(re.sub(r"\s+","", s or ""))
-
-def extract_main_and_cover(soup, base_url):
-    best, best_len = None, 0
-    for sel in CANDIDATE:
-        for n in soup.select(sel):
-            node = _clean(n)
-            text = " ".join([p.get_text(" ", strip=True) for p in node.find_all("p")]) or node.get_text(" ", strip=True)
-            L = text_len(text)
-            if L > best_len:
-                best, best_len = node, L
-    if best is None:
-        text = " ".join([p.get_text(" ", strip=True) for p in soup.find_all("p")])
-        imgs = soup.find_all("img")
-    else:
-        text = " ".join([p.get_text(" ", strip=True) for p in best.find_all("p")]) or best.get_text(" ", strip=True)
-        imgs = best.find_all("img")
-    main = re.sub(r"\s+"," ", text).strip()
-
-    cover = None
-    og = soup.select_one('meta[property="og:image"]') or soup.select_one('meta[name="og:image"]')
-    if og and og.get("content"):
-        cover = urljoin(base_url, og["content"].strip())
-    if not cover:
-        for im in imgs:
-            src = im.get("src") or im.get("data-src") or im.get("data-original")
-            if not src: 
-                continue
-            full = urljoin(base_url, src)
-            if any(ext in full.lower() for ext in [".svg",".ico",".gif"]):
-                continue
-            cover = full; break
-    return main, cover
-
 # ---------------- AI 接口（OpenAI 或 DeepSeek，采用 Chat Completions 兼容格式） ----------------
-def chat_complete(messages, provider="openai", model=None, temperature=0.5, max_tokens=800):
+def chat_complete(messages, provider="openai", model=None, temperature=0.5, max_tokens=800, kind="chat"):
+    """kind 用于统计：summarize / pick_top / intro / theme。"""
     if provider == "deepseek":
-        endpoint = "https://api.deepseek.com/v1/chat/completions"
+        endpoint = API_BASE["deepseek"].rstrip("/") + "/chat/completions"
         api_key = os.getenv("DEEPSEEK_API_KEY")
         default_model = "deepseek-chat"
     else:
-        endpoint = "https://api.openai.com/v1/chat/completions"
+        endpoint = API_BASE["openai"].rstrip("/") + "/chat/completions"
         api_key = os.getenv("OPENAI_API_KEY")
         default_model = "gpt-4o-mini"
     if not api_key:
         raise RuntimeError(f"未检测到 {'DEEPSEEK_API_KEY' if provider=='deepseek' else 'OPENAI_API_KEY'}")
+    model = model or default_model
     headers = {"Content-Type":"application/json","Authorization":f"Bearer {api_key}"}
-    payload = {"model": model or default_model, "messages": messages,
+    payload = {"model": model, "messages": messages,
                "temperature": temperature, "max_tokens": max_tokens}
-    r = requests.post(endpoint, headers=headers, json=payload, timeout=REQUEST_TIMEOUT)
-    r.raise_for_status()
-    return r.json()["choices"][0]["message"]["content"]
+    def _send():
+        r = http_post(endpoint, headers=headers, json=payload, timeout=REQUEST_TIMEOUT)
+        r.raise_for_status()
+        data = r.json()
+        usage = data.get("usage") or {}
+        incr(f"llm.{kind}.prompt_tokens", usage.get("prompt_tokens", 0))
+        incr(f"llm.{kind}.completion_tokens", usage.get("completion_tokens", 0))
+        return data["choices"][0]["message"]["content"]
+    # 先查本地缓存；未命中时 429 按 Retry-After 退避，并计入该 provider 的每分钟 token 预算
+    try:
+        with timed(f"llm.{kind}"):
+            return cached_completion(
+                provider, model, messages, temperature, max_tokens,
+                lambda: with_rate_limit(provider, estimate_tokens(messages, max_tokens, provider, model), _send), kind=kind)
+    except Exception:
+        incr(f"llm.{kind}.failed")
+        raise
 
-def summarize_article(title, url, text, provider):
-    text = text[:8000]
+SUMMARY_FORMAT = """第一行：不超过28字的高质量中文标题（不要引号）
+随后：3~5条要点，每条以“• ”开头，覆盖：谁/做了什么/何时何地/为何重要/影响
+最后一行：关键词：A, B, C（2~4 个）"""
+
+def summarize_article(title, url, text, provider, budget=PROMPT_BUDGET, trimmed=False):
+    # 按 token 预算挑选正文句子（导语优先、去掉复述标题与重复的句子），代替固定截断；
+    # trimmed=True 表示调用方已裁剪过（summarize_batch），不再重复裁剪
+    if not trimmed:
+        text = fit_body(text, title, provider=provider, budget=budget)
     prompt = f"""
 你是资深中文新闻编辑。仅基于我提供的【正文】，输出结构化摘要，禁止杜撰。
 输出格式：
-第一行：不超过28字的高质量中文标题（不要引号）
-随后：3~5条要点，每条以“• ”开头，覆盖：谁/做了什么/何时何地/为何重要/影响
-最后一行：关键词：A, B, C（2~4 个）
+{SUMMARY_FORMAT}
 【页面标题】{title}
 【来源链接】{url}
 【正文】{text}
@@ -147,7 +127,57 @@ def summarize_article(title, url, text, provider):
     return chat_complete(
         [{"role":"system","content":"你是严谨、客观的中文新闻编辑。"},
          {"role":"user","content":prompt}],
-        provider=provider, max_tokens=700)
+        provider=provider, max_tokens=700, kind="summarize")
+
+_BATCH_HEAD = re.compile(r"^\s*(?:=+|#+|【)?\s*摘要\s*[#＃]?\s*(\d+)\s*(?:=+|】)?\s*$", re.M)
+
+def _split_batch(out, n):
+    """把打包请求的输出按“=== 摘要 i ===”切回各篇；缺失或格式不对的篇目为 None。"""
+    out = re.sub(r"```[a-z]*", "", out or "")
+    heads = list(_BATCH_HEAD.finditer(out))
+    parts = [None] * n
+    for h, nxt in zip(heads, heads[1:] + [None]):
+        i = int(h.group(1)) - 1
+        body = out[h.end():nxt.start() if nxt else len(out)].strip()
+        if 0 <= i < n and parts[i] is None and "•" in body and body.splitlines()[0].strip():
+            parts[i] = body
+    return parts
+
+def summarize_batch(docs, provider, budget=PROMPT_BUDGET):
+    """
+    docs: [(title, url, text)]。短文章打包进一次请求，按分隔标记解析回各篇摘要；
+    长文章或解析失败的篇目逐篇调用 summarize_article。返回与 docs 等长的列表（失败的为 None）。
+    """
+    bodies = [fit_body(text, title, provider=provider, budget=budget) for title, _, text in docs]
+    short = [i for i, b in enumerate(bodies) if count_tokens(b, provider) <= BATCH_ARTICLE_TOKENS]
+    results = [None] * len(docs)
+    if len(short) > 1:
+        blocks = "\n\n".join(f"=== 文章 {k + 1} ===\n【页面标题】{docs[i][0]}\n【来源链接】{docs[i][1]}\n【正文】{bodies[i]}"
+                              for k, i in enumerate(short))
+        prompt = f"""
+你是资深中文新闻编辑。下面有 {len(short)} 篇文章，请逐篇、仅基于各自的【正文】输出结构化摘要，禁止杜撰，篇与篇之间不要混用信息。
+每篇先单独一行写“=== 摘要 N ===”（N 与文章编号一致），随后按以下格式：
+{SUMMARY_FORMAT}
+{blocks}
+""".strip()
+        try:
+            out = chat_complete(
+                [{"role":"system","content":"你是严谨、客观的中文新闻编辑。"},
+                 {"role":"user","content":prompt}],
+                provider=provider, max_tokens=350 * len(short), kind="summarize_batch")
+            for i, part in zip(short, _split_batch(out, len(short))):
+                results[i] = part
+        except Exception as e:
+            print("[批量摘要失败]", e)
+    for i, (title, url, _) in enumerate(docs):
+        if results[i] is None:
+            if i in short and len(short) > 1:
+                incr("llm.summarize_batch.fallback")
+            try:
+                results[i] = summarize_article(title, url, bodies[i], provider=provider, budget=budget, trimmed=True)
+            except Exception as e:
+                print("[摘要失败]", e)
+    return results
 
 def pick_top(candidates, k, provider):
     listing = "\n".join([f"[{i}] {c['title']} —— {c['lead']}" for i,c in enumerate(candidates)])
@@ -157,7 +187,7 @@ def pick_top(candidates, k, provider):
     out = chat_complete(
         [{"role":"system","content":"你是新闻价值判断助手。"},
          {"role":"user","content":prompt}],
-        provider=provider, max_tokens=200, temperature=0.2)
+        provider=provider, max_tokens=200, temperature=0.2, kind="pick_top")
     import json, re
     m = re.search(r"\[.*\]", out, re.S)
     if not m: 
@@ -174,7 +204,7 @@ def overall_intro(titles, provider):
     return chat_complete(
         [{"role":"system","content":"你是新闻导语撰写助手。"},
          {"role":"user","content":prompt}],
-        provider=provider, max_tokens=160, temperature=0.5)
+        provider=provider, max_tokens=160, temperature=0.5, kind="intro")
 
 def _extract_json_block(s):
     if not s: return None
@@ -219,43 +249,179 @@ def design_theme(titles, provider):
     out = chat_complete(
         [{"role":"system","content":"你是优秀的 UI/UX 设计师，强调对比度与可读性。"},
          {"role":"user","content":prompt}],
-        provider=provider, max_tokens=500, temperature=0.9)
+        provider=provider, max_tokens=500, temperature=0.9, kind="theme")
     return _extract_json_block(out)
 
-def main():
-    ap = argparse.ArgumentParser()
-    # ap.add_argument("--source", type=str, default=None)
-    ap.add_argument("--source", type=str, default=r"F:\creat\pa\code\result_with_links22.txt")
-    ap.add_argument("--out", type=str, default=os.path.join("code","news_data.json"))
-    ap.add_argument("--provider", type=str, default="openai", choices=["openai","deepseek"])
-    ap.add_argument("--limit", type=int, default=18)
-    args = ap.parse_args()
+def local_rank(docs, k, store=None):
+    """本地 TF-IDF/中心度/新颖度排序，返回索引；未安装 numpy 时返回 None。"""
+    try:
+        from ranker import rank, HISTORY_DAYS
+    except ImportError:
+        print("[选题] 未安装 numpy，改用 LLM 选题")
+        return None
+    with timed("rank"):
+        history = store.history(HISTORY_DAYS) if store else []
+        return rank([(d["title"], d["body"]) for d in docs], k, history)
 
-    source = args.source or autodetect_latest_source()
-    if not source or not os.path.exists(source):
-        raise FileNotFoundError("未找到爬虫结果（code/result_with_links*.txt）")
+def make_dedup(store=None):
+    """
+    返回去重函数 fn(doc, order)：每个近似重复簇本次只保留 order（输入下标）最小的一篇，其余返回 None 丢弃；
+    簇的代表是前几天的文章时，保留的那篇沿用它的摘要。须按输入顺序调用，结果才与抓取快慢无关。
+    未安装 numpy 时返回 None。
+    """
+    try:
+        from dedup import DedupIndex, signature, to_bytes, from_bytes, HISTORY_DAYS
+    except ImportError:
+        print("[去重] 未安装 numpy，跳过近似去重")
+        return None
+    index, past = DedupIndex(), {}
+    history = store.signatures(HISTORY_DAYS) if store else []
+    for j, (url, blob, summary) in enumerate(history):
+        index.add(url, from_bytes(blob), order=j - len(history))   # 历史文章排在本次所有文章之前
+        past[url] = summary
+
+    def _dedup(doc, order):
+        with timed("dedup"):
+            sig = signature(doc["body"])
+            key = normalize_url(doc["url"])
+            rep = index.add(key, sig, order=order)
+            first = index.claim(key)
+        if store:
+            store.upsert(doc["url"], minhash=to_bytes(sig))
+        if not first:
+            # 同簇已有文章入选（不论代表是本次的还是前几天的）
+            incr("dedup.dropped")
+            print(f"[去重] {doc['url']} 与 {index.find(key)} 近似重复，跳过")
+            return None
+        if rep in past and doc["summary"] is None and past[rep]:
+            doc["summary"], doc["reused"] = past[rep], True
+            incr("dedup.summary_reused")
+            if store:
+                store.upsert(doc["url"], summary=past[rep])
+        return doc
+    return _dedup
+
+def analyze(pairs, provider="openai", limit=18, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST,
+            llm_workers=DEFAULT_INFLIGHT, extract_workers=EXTRACT_WORKERS, chunksize=DEFAULT_CHUNKSIZE,
+            queue_size=DEFAULT_QUEUE_SIZE, only_new=False, use_store=True, prompt_budget=PROMPT_BUDGET,
+            summary_batch=SUMMARY_BATCH, rank=RANK_MODE, shortlist=SHORTLIST, dedup=True):
+    """
+    pairs: [(锚文本, url)]（load_pairs 或 pa.crawl_sites 的结果）
+    返回写入 news_data.json 的数据：{date, overall_intro, theme, articles}
+    """
+    store = ArticleStore() if use_store else None
+    if store and only_new:
+        pairs = [(t, u) for t, u in pairs if not store.seen_before(u)]
+    pairs = pairs[:limit]
+    limiter = HostLimiter(per_host)
+
+    def _fetch(pair):
+        anchor_text, url = pair
+        with limiter.slot(url):
+            html = fetch_html(url)
+        return (anchor_text, url, html) if html else None
+
+    def _extract(items):
+        # 页面未变的复用上次解析结果，其余按批送进程池解析
+        recs = [store.get(url) if store else None for _, url, _ in items]
+        hashes = [content_hash(html) for _, _, html in items]
+        parsed = [(r["title"], r["body"], r["cover"]) if r and r["html_hash"] == h else None
+                  for r, h in zip(recs, hashes)]
+        need = [j for j, p in enumerate(parsed) if p is None]
+        if need:
+            jobs = [(items[j][2], items[j][1], items[j][0]) for j in need]
+            for j, rec in zip(need, extract_pool(jobs)):
+                parsed[j] = rec
+        docs = []
+        for (_, url, _), rec, html_hash, (title, body, cover) in zip(items, recs, hashes, parsed):
+            if len(body) < 120:   # 过短的正文跳过
+                docs.append(None)
+                continue
+            body_hash = content_hash(body)
+            # 正文未变且已有摘要：直接复用，不再调用 LLM
+            reuse = rec["summary"] if rec and rec["body_hash"] == body_hash and rec["summary"] else None
+            if store:
+                store.upsert(url, html_hash=html_hash, body_hash=body_hash,
+                             title=title, body=body, cover=cover, summary=reuse)
+            docs.append({"title": title, "url": url, "body": body, "cover": cover,
+                         "summary": reuse, "reused": reuse is not None})
+        return docs
+
+    def _summarize(batch):
+        todo = [d for d in batch if d["summary"] is None]
+        if not todo:
+            return batch
+        summaries = summarize_batch([(d["title"], d["url"], d["body"]) for d in todo],
+                                    provider=provider, budget=prompt_budget)
+        for d, summ in zip(todo, summaries):
+            d["summary"] = summ
+            if store and summ:
+                store.upsert(d["url"], summary=summ)
+        return batch
+
+    dedup_fn = make_dedup(store) if dedup else None
+    size = max(1, summary_batch)
+    # local/hybrid 且候选超过 shortlist 时要先拿到全部文章做本地排序，只有这时才等抓取全部结束
+    wait_all = rank != "llm" and shortlist and len(pairs) > shortlist
+    window, pending, admitted = [], [], [0]
+
+    def _flush(pool):
+        if window:
+            pending.append(pool.submit(_summarize, list(window)))
+            window.clear()
+
+    def _queue(doc, pool):
+        # 待摘要的文章按输入顺序切成固定窗口再打包：同样的输入得到同样的提示词，重跑能命中 LLM 缓存
+        if doc["summary"] is None:
+            window.append(doc)
+            if len(window) >= size:
+                _flush(pool)
+
+    def _admit(doc, pool):
+        # ordered 阶段：按输入顺序逐篇调用，去重选代表与窗口划分都与抓取快慢无关
+        order = admitted[0]
+        admitted[0] += 1
+        if dedup_fn and dedup_fn(doc, order) is None:
+            return None
+        if pool is not None:
+            _queue(doc, pool)
+        return doc
+
+    with ExtractPool(workers=extract_workers, expected=len(pairs)) as extract_pool, \
+            ThreadPoolExecutor(max_workers=max(1, llm_workers)) as llm_pool:
+        # 抓取 → 解析 → 去重/摘要 流式进行：第 1 篇在摘要时，第 10 篇可能还在抓取
+        stages = [
+            Stage("抓取", _fetch, workers=workers),
+            Stage("解析", _extract, workers=max(1, extract_workers), batch=chunksize, linger=DEFAULT_LINGER),
+            Stage("去重", lambda d: _admit(d, None if wait_all else llm_pool), ordered=True)]
+        docs = run_pipeline(pairs, stages, maxsize=queue_size)
+        if wait_all:
+            if len(docs) > shortlist:
+                # 本地排序后只把前 shortlist 篇送去摘要
+                keep = local_rank(docs, shortlist, store)
+                if keep is not None:
+                    docs = [docs[i] for i in sorted(keep)]
+                    print(f"[选题] 本地预筛：{len(docs)} 篇进入摘要")
+            for d in docs:
+                _queue(d, llm_pool)
+        _flush(llm_pool)
+        for fut in pending:
+            try:
+                fut.result()
+            except Exception as e:
+                print("[摘要失败]", e)
+    reused = sum(1 for d in docs if d["reused"])
+    incr("store.summary_reused", reused)
+    print(f"[文章库] 共 {len(docs)} 篇，复用摘要 {reused} 篇，新摘要 {len(docs) - reused} 篇")
 
-    pairs = load_pairs(source)[:args.limit]
     articles_raw = []
-    for anchor_text, url in pairs:
-        html = fetch_html(url)
-        if not html: 
-            continue
-        soup = BeautifulSoup(html, "html.parser")
-        title = extract_title(soup, fallback=anchor_text)
-        body, cover = extract_main_and_cover(soup, url)
-        if len(body) < 120:   # 过短的正文跳过
-            continue
-        try:
-            summ = summarize_article(title, url, body, provider=args.provider)
-        except Exception as e:
-            print("[摘要失败]", e); 
-            summ = None
-        lead = (summ or "").splitlines()[0].strip() if summ else title
-        site = urlparse(url).netloc
+    for d in docs:
+        summ = d["summary"]
+        lead = (summ or "").splitlines()[0].strip() if summ else d["title"]
+        site = urlparse(d["url"]).netloc
         articles_raw.append({
-            "title": title, "link": url, "site": site,
-            "cover_url": cover, "raw_summary": summ or "",
+            "title": d["title"], "link": d["url"], "site": site,
+            "cover_url": d["cover"], "raw_summary": summ or "",
             "lead": lead
         })
 
@@ -264,30 +430,78 @@ def main():
 
     # 选题 Top K
     k = min(10, len(articles_raw))
-    idxs = pick_top(articles_raw, k, provider=args.provider)
+    idxs = local_rank(docs, k, store) if rank == "local" else None
+    if idxs is None:
+        try:
+            idxs = pick_top(articles_raw, k, provider=provider)
+        except Exception as e:
+            print("[选题失败]", e)
+            idxs = local_rank(docs, k, store) or list(range(k))
     selected = [articles_raw[i] for i in idxs]
     titles = [a["title"] for a in selected]
 
     # 总导语 + 主题
     try:
-        intro = overall_intro(titles, provider=args.provider)
+        intro = overall_intro(titles, provider=provider)
     except Exception as e:
         print("[导语失败]", e); intro = ""
     try:
-        theme = design_theme(titles, provider=args.provider) or {}
+        theme = design_theme(titles, provider=provider) or {}
     except Exception as e:
         print("[主题失败]", e); theme = {}
 
-    out = {
+    return {
         "date": datetime.now().strftime("%Y-%m-%d"),
         "overall_intro": intro or "",
         "theme": theme or {},
         "articles": selected
     }
-    os.makedirs(os.path.dirname(args.out), exist_ok=True)
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
+
+def save_data(data, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def main():
+    ap = argparse.ArgumentParser()
+    # ap.add_argument("--source", type=str, default=None)
+    ap.add_argument("--source", type=str, default=r"F:\creat\pa\code\result_with_links22.txt")
+    ap.add_argument("--out", type=str, default=os.path.join("code","news_data.json"))
+    ap.add_argument("--provider", type=str, default="openai", choices=["openai","deepseek"])
+    ap.add_argument("--limit", type=int, default=18)
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="并发抓取的全局上限")
+    ap.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="同一站点的并发上限")
+    ap.add_argument("--llm-workers", type=int, default=DEFAULT_INFLIGHT, help="同时在途的摘要请求数")
+    ap.add_argument("--no-cache", action="store_true", help="不读写 LLM 结果缓存")
+    ap.add_argument("--refresh", action="store_true", help="忽略已有缓存，重新请求并覆盖")
+    ap.add_argument("--extract-workers", type=int, default=EXTRACT_WORKERS, help="解析/抽取进程数（1 为不用进程池）")
+    ap.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="每次派给解析进程的网页数")
+    ap.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="流水线阶段间队列长度（背压）")
+    ap.add_argument("--only-new", action="store_true", help="只处理此前运行中没出现过的 URL")
+    ap.add_argument("--no-store", action="store_true", help="不读写跨天文章库（每篇都重新解析/摘要）")
+    ap.add_argument("--prompt-budget", type=int, default=PROMPT_BUDGET, help="摘要时正文部分的 token 上限")
+    ap.add_argument("--rank", type=str, default=RANK_MODE, choices=["llm","local","hybrid"],
+                    help="选题方式：LLM / 本地排序 / 本地预筛 + LLM")
+    ap.add_argument("--shortlist", type=int, default=SHORTLIST, help="local/hybrid 下最多摘要的篇数（0 为不预筛）")
+    ap.add_argument("--no-dedup", action="store_true", help="不做近似重复聚类")
+    ap.add_argument("--summary-batch", type=int, default=SUMMARY_BATCH, help="每次请求打包的短文章数（1 为逐篇）")
+    args = ap.parse_args()
+    configure_llm_cache(enabled=not args.no_cache, refresh=args.refresh)
+
+    source = args.source or autodetect_latest_source()
+    if not source or not os.path.exists(source):
+        raise FileNotFoundError("未找到爬虫结果（code/result_with_links*.txt）")
+
+    data = analyze(load_pairs(source), provider=args.provider, limit=args.limit,
+                   workers=args.workers, per_host=args.per_host, llm_workers=args.llm_workers,
+                   extract_workers=args.extract_workers, chunksize=args.chunksize,
+                   queue_size=args.queue_size, only_new=args.only_new, use_store=not args.no_store,
+                   prompt_budget=args.prompt_budget, summary_batch=args.summary_batch,
+                   rank=args.rank, shortlist=args.shortlist, dedup=not args.no_dedup)
+    save_data(data, args.out)
     print(f"[OK] 写出：{args.out}")
+    report = write_report(os.path.join(os.path.dirname(args.out), REPORT_NAME))
+    print(f"[OK] 运行报告：{report}")
 
 if __name__ == "__main__":
     main()
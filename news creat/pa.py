@@ -1,112 +1,279 @@
-import time
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.edge.options import Options as EdgeOptions
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.common.exceptions import WebDriverException
 import os
+import json
+import argparse
+from html.parser import HTMLParser
 from urllib.parse import urlparse, urljoin
+from http_client import http_get
+from fetcher import fetch_all
+from article_store import normalize_url
 
 # --- 配置部分 ---
-options = EdgeOptions()
-options.add_argument('--headless')
-options.add_argument('--disable-gpu')
-options.add_argument('log-level=3') # 禁用不必要的日志输出
+UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+      "(KHTML, like Gecko) Chrome/123.0 Safari/537.36")
 
-# 请确保这里的路径是正确的
+# 浏览器模式（--mode browser）才需要：请确保这里的路径是正确的
 driver_path = r"C:\Users\pinkl\Desktop\新建文件夹\edgedriver_win64\msedgedriver.exe"
-service = EdgeService(executable_path=driver_path)
 
 # --- 文件路径配置 ---
 output_dir = r"F:\creat\pa\code"
 output_file = os.path.join(output_dir, "result_with_links22.txt")
-os.makedirs(output_dir, exist_ok=True)
 
 # --- 目标网站设置 ---
-# 您可以在这里更改您想要爬取的网站，例如 "https://www.stnn.cc/ent" 或 "https://www.gov.cn/","https://www.chinawriter.com.cn/403990/index.html","https://www.chinawriter.com.cn/404057/index.html"
+# 单站模式（--url）默认爬取的网站
 url_to_crawl = "https://www.bbc.com/zhongwen/simp"
+# 多站模式默认的种子站点；也可用 --sites 指定 JSON 配置文件：
+#   [{"url": "https://www.gov.cn/", "mode": "static", "wait": 10}, "https://www.stnn.cc/ent", ...]
+SEED_SITES = [
+    {"url": "https://www.bbc.com/zhongwen/simp", "mode": "static"},
+    {"url": "https://www.stnn.cc/ent", "mode": "static"},
+    {"url": "https://www.gov.cn/", "mode": "static"},
+    {"url": "https://www.chinawriter.com.cn/403990/index.html", "mode": "static"},
+    {"url": "https://www.chinawriter.com.cn/404057/index.html", "mode": "static"},
+]
+# 多站调度：全局并发、同一域名并发上限与相邻请求间隔（秒）
+CRAWL_WORKERS = 5
+CRAWL_PER_DOMAIN = 1
+CRAWL_DELAY = 1.0
+
+# 定义通用的链接过滤规则
+common_exclude_keywords = ['登录', '注册', '版权', '隐私', 'English', '留言', '投稿', '更多']
+exclude_exts = ['.jpg', '.jpeg', '.png', '.gif', '.mp4', '.avi', '.mov']
+
+# 浏览器模式：一次脚本调用取回全部 <a> 的 [text, href, visible]，避免逐元素的 WebDriver 往返
+COLLECT_LINKS_JS = """
+return Array.from(document.getElementsByTagName('a'), function (a) {
+  var visible = !!(a.offsetWidth || a.offsetHeight || a.getClientRects().length);
+  return [a.innerText || '', a.href || a.getAttribute('href') || '', visible];
+});
+"""
+
+
+def is_valid_news_link(link_text, full_url, base_domain, seen=()):
+    parsed_url = urlparse(full_url)
+    return (
+        # 链接文本长度适中，避免抓取短的导航链接
+        len(link_text) > 15 and
+        # 链接在当前域名下
+        parsed_url.netloc == base_domain and
+        # 排除包含常见非新闻关键词的链接
+        not any(keyword in link_text for keyword in common_exclude_keywords) and
+        # URL 中通常包含多级目录，并且不以域名或栏目名称结尾
+        parsed_url.path.count('/') > 2 and
+        # 排除图片、视频等文件链接
+        not any(full_url.lower().endswith(ext) for ext in exclude_exts) and
+        # 排除以 # 或 ? 开头的内部锚点或参数链接
+        '#' not in full_url and '?' not in full_url and
+        # 排除重复链接
+        full_url not in seen
+    )
+
+
+def filter_links(page_url, links):
+    """links: [(text, href, visible), ...]；按页面地址补全 URL 并过滤，返回 {url: text}（保持出现顺序）。"""
+    unique_links = {}
+    base_domain = urlparse(page_url).netloc
+    for link_text, link_href, visible in links:
+        if not link_href or not visible:
+            continue
+        link_text = (link_text or "").strip()
+        full_url = urljoin(page_url, link_href)
+        if is_valid_news_link(link_text, full_url, base_domain, unique_links):
+            unique_links[full_url] = link_text
+            print(f"找到潜在的新闻链接: {link_text} -> {full_url}")
+    return unique_links
+
+
+class _AnchorParser(HTMLParser):
+    """只收集 <title> 与 <a href> 的文本，跳过 script/style。"""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title, self.links = "", []
+        self._in_title, self._skip = False, 0
+        self._href, self._buf, self._depth = None, [], 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style", "noscript"):
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "a":
+            if self._href is None:
+                self._href, self._buf, self._depth = dict(attrs).get("href"), [], 1
+            else:
+                self._depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style", "noscript"):
+            self._skip = max(0, self._skip - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag == "a" and self._href is not None:
+            self._depth -= 1
+            if self._depth <= 0:
+                # 静态 HTML 无法判断可见性，一律视为可见
+                self.links.append((" ".join("".join(self._buf).split()), self._href, True))
+                self._href = None
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._in_title:
+            self.title += data
+        if self._href is not None:
+            self._buf.append(data)
+
+
+def collect_static(url):
+    """HTTP 直接取首页 HTML，用标准库解析器提取链接。返回 (网页标题, [(text, href, visible), ...])。"""
+    r = http_get(url, headers={"User-Agent": UA}, timeout=30)
+    r.raise_for_status()
+    r.encoding = r.apparent_encoding or "utf-8"
+    parser = _AnchorParser()
+    parser.feed(r.text)
+    parser.close()
+    return parser.title.strip(), parser.links
+
+
+def collect_browser(url, wait=10):
+    """需要执行 JS 的页面：无头 Edge 打开后等待链接出现（最多 wait 秒），而不是固定等待。"""
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.edge.options import Options as EdgeOptions
+    from selenium.webdriver.edge.service import Service as EdgeService
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    options = EdgeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--disable-gpu')
+    options.add_argument('log-level=3') # 禁用不必要的日志输出
+    service = EdgeService(executable_path=driver_path)
 
-try:
     print("正在启动虚拟浏览器...")
     driver = webdriver.Edge(service=service, options=options)
     print("浏览器启动成功。")
+    try:
+        print(f"正在访问：{url}")
+        driver.get(url)
+        print(f"等待页面加载完成（最多 {wait} 秒）...")
+        WebDriverWait(driver, wait).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+            and d.find_elements(By.TAG_NAME, 'a'))
+        # 一次往返取回全部链接，过滤在 Python 侧完成
+        links = driver.execute_script(COLLECT_LINKS_JS) or []
+        return driver.title, [tuple(item) for item in links if len(item) == 3]
+    finally:
+        # 关闭浏览器，释放资源
+        print("关闭浏览器...")
+        driver.quit()
 
-    # --- 爬取部分 ---
-    print(f"正在访问：{url_to_crawl}")
-    driver.get(url_to_crawl)
-
-    print("等待10秒钟以确保页面内容加载...")
-    time.sleep(10)
 
-    # --- 提取并写入文件 ---
-    with open(output_file, 'w', encoding='utf-8') as f:
-        print(f"准备将网页所有链接信息写入文件: {output_file}")
-        title = driver.title
+def write_links(path, title, unique_links):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        print(f"准备将网页所有链接信息写入文件: {path}")
         f.write(f"网页标题：{title}\n\n")
         f.write("--- 网页中所有可见链接信息 ---\n")
-
-        # 抓取页面上所有可见的链接
-        link_elements = driver.find_elements(By.TAG_NAME, 'a')
-        
-        unique_links = {}
-        base_domain = urlparse(url_to_crawl).netloc
-        
-        # 定义通用的链接过滤规则
-        common_exclude_keywords = ['登录', '注册', '版权', '隐私', 'English', '留言', '投稿', '更多']
-        
-        for link_element in link_elements:
-            try:
-                link_text = link_element.text.strip()
-                link_href = link_element.get_attribute('href')
-                
-                if not link_href:
-                    continue
-
-                full_url = urljoin(url_to_crawl, link_href)
-                parsed_url = urlparse(full_url)
-                
-                # 通用过滤条件
-                is_valid_news_link = (
-                    # 链接文本长度适中，避免抓取短的导航链接
-                    len(link_text) > 15 and
-                    # 链接在当前域名下
-                    parsed_url.netloc == base_domain and
-                    # 排除包含常见非新闻关键词的链接
-                    not any(keyword in link_text for keyword in common_exclude_keywords) and
-                    # URL 中通常包含多级目录，并且不以域名或栏目名称结尾
-                    parsed_url.path.count('/') > 2 and
-                    # 排除图片、视频等文件链接
-                    not any(full_url.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.mp4', '.avi', '.mov']) and
-                    # 排除以 # 或 ? 开头的内部锚点或参数链接
-                    '#' not in full_url and '?' not in full_url and
-                    # 排除重复链接
-                    full_url not in unique_links
-                )
-
-                if is_valid_news_link:
-                    unique_links[full_url] = link_text
-                    print(f"找到潜在的新闻链接: {link_text} -> {full_url}")
-
-            except Exception as e:
-                # 发生错误时继续处理下一个链接
-                continue
-        
-        if not unique_links:
-            print("未能找到任何有效的新闻链接。请检查网址或放宽筛选条件。")
-
         for url, text in unique_links.items():
             f.write(f"文本: {text}\nURL: {url}\n---\n")
 
-    print(f"所有链接信息已成功写入文件：{output_file}")
 
-except WebDriverException as e:
-    print("发生错误，请检查驱动程序路径是否正确或URL是否有效。")
-    print(f"错误信息: {e}")
+def crawl(url, mode="static", wait=10):
+    """返回 (网页标题, {url: text})。"""
+    if mode == "browser":
+        title, links = collect_browser(url, wait=wait)
+    else:
+        title, links = collect_static(url)
+    return title, filter_links(url, links)
 
-finally:
-    # 关闭浏览器，释放资源
-    if 'driver' in locals():
-        print("关闭浏览器...")
-        driver.quit()
-        print("爬虫任务完成。")
- #source venv/Scripts/activate
\ No newline at end of file
+
+def interleave_by_site(unique_links):
+    """按域名轮流排列链接（各站内保持原顺序），截取前 N 篇时每个站点都有份。"""
+    groups = {}
+    for url, text in unique_links.items():
+        groups.setdefault(urlparse(url).netloc.lower(), []).append((url, text))
+    out, lists = {}, list(groups.values())
+    for i in range(max((len(g) for g in lists), default=0)):
+        for g in lists:
+            if i < len(g):
+                out[g[i][0]] = g[i][1]
+    return out
+
+
+def links_to_pairs(unique_links):
+    """{url: text} → [(text, url)]，与 news_analyzer.load_pairs 的返回格式一致。"""
+    return [(text, url) for url, text in unique_links.items()]
+
+
+def load_sites(path):
+    """读取种子站点配置：元素可以是 URL 字符串，或 {"url", "mode", "wait"}。"""
+    with open(path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    return [{"url": it} if isinstance(it, str) else dict(it) for it in items]
+
+
+def crawl_sites(sites, workers=CRAWL_WORKERS, per_domain=CRAWL_PER_DOMAIN, delay=CRAWL_DELAY,
+                mode="static", wait=10):
+    """
+    并发爬取多个种子站点（同一域名限并发并保持间隔），各站点分别套用链接过滤，
+    再按规范化 URL 合并去重。mode/wait 为站点未单独配置时的默认值。返回 (标题列表, {url: text})。
+    """
+    by_url = {}
+    for site in sites:
+        by_url.setdefault(site["url"], site)
+
+    def _one(url):
+        site = by_url[url]
+        try:
+            return crawl(url, mode=site.get("mode", mode), wait=site.get("wait", wait))
+        except Exception as e:
+            print(f"[爬取失败] {url}: {e}")
+            return "", {}
+
+    results = fetch_all(list(by_url), _one, workers=workers, per_host=per_domain, delay=delay)
+    titles, merged, seen = [], {}, set()
+    for title, links in results:
+        if title:
+            titles.append(title)
+        for url, text in links.items():
+            key = normalize_url(url)
+            if key not in seen:
+                seen.add(key)
+                merged[url] = text
+    return titles, merged
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mode", choices=["static", "browser"], default="static",
+                    help="static：HTTP 抓取静态 HTML（默认，快）；browser：无头 Edge，适合依赖 JS 的页面")
+    ap.add_argument("--url", type=str, default=None, help="只爬取这一个网站（不传则按种子站点列表多站爬取）")
+    ap.add_argument("--sites", type=str, default=None, help="种子站点 JSON 配置文件（默认使用 SEED_SITES）")
+    ap.add_argument("--out", type=str, default=output_file)
+    ap.add_argument("--wait", type=float, default=10, help="browser 模式等待链接出现的最长秒数")
+    ap.add_argument("--workers", type=int, default=CRAWL_WORKERS, help="同时爬取的站点数")
+    ap.add_argument("--per-domain", type=int, default=CRAWL_PER_DOMAIN, help="同一域名的并发上限")
+    ap.add_argument("--delay", type=float, default=CRAWL_DELAY, help="同一域名相邻请求的最小间隔（秒）")
+    args = ap.parse_args()
+
+    try:
+        if args.url:
+            title, unique_links = crawl(args.url, mode=args.mode, wait=args.wait)
+        else:
+            sites = load_sites(args.sites) if args.sites else SEED_SITES
+            titles, unique_links = crawl_sites(sites, workers=args.workers, per_domain=args.per_domain,
+                                               delay=args.delay, mode=args.mode, wait=args.wait)
+            title = " | ".join(titles)
+    except Exception as e:
+        print("发生错误，请检查URL是否有效（browser 模式还需检查驱动程序路径是否正确）。")
+        print(f"错误信息: {e}")
+        return
+
+    if not unique_links:
+        print("未能找到任何有效的新闻链接。请检查网址或放宽筛选条件。")
+    write_links(args.out, title, unique_links)
+    print(f"所有链接信息已成功写入文件：{args.out}")
+    print("爬虫任务完成。")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+page_cache.py
+网页的本地响应缓存 + 条件请求（conditional GET）：
+- 每个 URL 存一份 JSON：正文（已解码文本）、最终 URL、编码、ETag、Last-Modified
+- 再次抓取时带 If-None-Match / If-Modified-Since；服务器回 304 时直接用缓存正文，
+  既不重新下载，也不再做 apparent_encoding 编码探测
+用法：
+  from page_cache import fetch_cached
+  text = fetch_cached(url, headers={"User-Agent": UA}, timeout=30)
+"""
+import os
+import json
+import time
+import hashlib
+from http_client import http_get
+from metrics import timed, incr
+
+PAGE_CACHE_DIR = os.path.join("code", "cache", "pages")
+
+_settings = {"enabled": True, "dir": PAGE_CACHE_DIR}
+
+
+def configure(enabled=None, cache_dir=None):
+    if enabled is not None:
+        _settings["enabled"] = enabled
+    if cache_dir is not None:
+        _settings["dir"] = cache_dir
+
+
+def _path(url):
+    return os.path.join(_settings["dir"], hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+
+def load_entry(url):
+    try:
+        with open(_path(url), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_entry(url, entry):
+    os.makedirs(_settings["dir"], exist_ok=True)
+    fp = _path(url)
+    tmp = fp + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp, fp)
+
+
+def fetch_cached(url, headers=None, timeout=30):
+    """返回页面文本；网络/HTTP 错误原样抛出，由调用方决定如何处理。"""
+    if not _settings["enabled"]:
+        with timed("fetch"):
+            r = http_get(url, headers=headers, timeout=timeout)
+            r.raise_for_status()
+            incr("fetch.bytes", len(r.content))
+            r.encoding = r.apparent_encoding or "utf-8"
+            return r.text
+
+    entry = load_entry(url)
+    req_headers = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            req_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            req_headers["If-Modified-Since"] = entry["last_modified"]
+
+    with timed("fetch"):
+        r = http_get(url, headers=req_headers, timeout=timeout)
+        if r.status_code == 304 and entry:
+            incr("fetch.not_modified")
+            return entry["body"]
+        r.raise_for_status()
+        incr("fetch.bytes", len(r.content))
+        r.encoding = r.apparent_encoding or "utf-8"
+        text = r.text
+    save_entry(url, {
+        "url": url, "final_url": r.url, "encoding": r.encoding,
+        "etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified"),
+        "fetched": time.time(), "body": text,
+    })
+    return text
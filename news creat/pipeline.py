@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+pipeline.py
+进程内流式流水线：阶段之间用有界队列连接，每个阶段内多线程并行。
+- 条目逐个流过各阶段：第 1 篇在摘要时，第 10 篇可能还在抓取
+- 背压：下游慢时队列填满，上游 put 阻塞，内存不会无限增长
+- 阶段函数返回 None 表示丢弃该条目；最终结果按输入顺序返回
+- batch>1 的阶段一次取多条（最多等待 linger 秒凑批），fn 接收列表并返回等长列表；
+  同一阶段的线程轮流取批（取批时加锁），空闲线程再多也不会把批拆成一条一条
+- ordered=True 的阶段单线程、严格按输入顺序调用 fn：先到的后序条目暂存，等前面的到齐（或已被丢弃）再放行，
+  适合结果依赖先后顺序的步骤（去重选代表、按固定窗口打包）；被丢弃的条目以占位标记继续向下游传递
+用法：
+  results = run_pipeline(items, [Stage("抓取", fetch, workers=8),
+                                 Stage("解析", parse, workers=4, batch=4),
+                                 Stage("摘要", summarize, workers=4)])
+"""
+import time
+import queue
+import threading
+
+DEFAULT_QUEUE_SIZE = 16
+_DONE = object()
+_SKIP = object()          # 被丢弃条目的占位，让 ordered 阶段知道该下标不会再来
+
+
+class Stage:
+    def __init__(self, name, fn, workers=1, batch=1, linger=0.0, ordered=False):
+        self.name, self.fn = name, fn
+        self.ordered = bool(ordered)
+        self.workers = 1 if ordered else max(1, int(workers))
+        self.batch = 1 if ordered else max(1, int(batch))
+        self.linger = max(0.0, float(linger))
+        self._take_lock = threading.Lock()
+
+
+def _take_batch(q, size, linger):
+    """阻塞取第一条，再在 linger 秒内尽量凑满 size 条；遇到结束标记时一并返回。"""
+    first = q.get()
+    if first is _DONE:
+        return [], True
+    items, deadline = [first], time.monotonic() + linger
+    while len(items) < size:
+        try:
+            nxt = q.get(timeout=max(0.0, deadline - time.monotonic())) if linger else q.get_nowait()
+        except queue.Empty:
+            break
+        if nxt is _DONE:
+            return items, True
+        items.append(nxt)
+    return items, False
+
+
+def run_pipeline(items, stages, maxsize=DEFAULT_QUEUE_SIZE):
+    """返回未被丢弃的结果，按输入顺序排列。阶段内的异常只丢弃对应条目；若全部失败则抛出第一个异常。"""
+    queues = [queue.Queue(maxsize=maxsize) for _ in range(len(stages) + 1)]
+    errors, lock = [], threading.Lock()
+    remaining = [s.workers for s in stages]
+
+    def _feed():
+        for i, it in enumerate(items):
+            queues[0].put((i, it))
+        for _ in range(stages[0].workers):
+            queues[0].put(_DONE)
+
+    def _finish(k):
+        # 本阶段最后一个线程退出时，通知下游所有线程结束
+        with lock:
+            remaining[k] -= 1
+            last = remaining[k] == 0
+        if last:
+            n = stages[k + 1].workers if k + 1 < len(stages) else 1
+            for _ in range(n):
+                queues[k + 1].put(_DONE)
+
+    def _call(stage, batch):
+        """对 [(i, item)] 调用阶段函数；返回等长的输出，丢弃的为 _SKIP。"""
+        live = [(i, it) for i, it in batch if it is not _SKIP]
+        outs = {}
+        if live:
+            try:
+                res = stage.fn([it for _, it in live]) if stage.batch > 1 else [stage.fn(live[0][1])]
+                outs = {i: out for (i, _), out in zip(live, res)}
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                print(f"[{stage.name}失败] {e}")
+        return [(i, _SKIP if outs.get(i) is None else outs[i]) for i, _ in batch]
+
+    def _work(k):
+        stage, q_in, q_out = stages[k], queues[k], queues[k + 1]
+        pending, nxt = {}, 0      # ordered 阶段：暂存乱序到达的条目
+        done = False
+        while not done:
+            if stage.batch > 1:
+                with stage._take_lock:
+                    batch, done = _take_batch(q_in, stage.batch, stage.linger)
+            else:
+                it = q_in.get()
+                batch, done = ([], True) if it is _DONE else ([it], False)
+            if stage.ordered:
+                pending.update(batch)
+                batch = []
+                while nxt in pending:
+                    batch.append((nxt, pending.pop(nxt)))
+                    nxt += 1
+            for item in (batch if stage.ordered else [batch] if batch else []):
+                for out in _call(stage, [item] if stage.ordered else item):
+                    q_out.put(out)
+        _finish(k)
+
+    threads = [threading.Thread(target=_feed, daemon=True)]
+    for k, stage in enumerate(stages):
+        threads += [threading.Thread(target=_work, args=(k,), daemon=True) for _ in range(stage.workers)]
+    for t in threads:
+        t.start()
+
+    results = {}
+    while True:
+        it = queues[-1].get()
+        if it is _DONE:
+            break
+        if it[1] is not _SKIP:
+            results[it[0]] = it[1]
+    for t in threads:
+        t.join()
+    if errors and not results:
+        raise errors[0]
+    return [results[i] for i in sorted(results)]
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+prompt_budget.py
+摘要提示词的正文裁剪：按 provider/模型估算 token，在预算内挑选信息量最高的句子，替代固定的 text[:8000]。
+- 导语（前几句）优先保留
+- 与标题几乎一致的句子、彼此近似重复的句子直接去掉
+- 其余句子按 与标题相关度 / 数字 / 专有名词 / 位置 打分，按分数装入预算，输出时保持原文顺序
+用法：
+  from prompt_budget import fit_body
+  body = fit_body(text, title, provider="openai", budget=1800)
+"""
+import re
+from metrics import incr
+
+DEFAULT_BUDGET = 1800     # 正文部分的 token 上限
+LEAD_SENTENCES = 3        # 优先保留的导语句数
+TITLE_DUP = 0.8           # 句子的字二元组有这么多落在标题里，视为复述标题
+SENT_DUP = 0.8            # 两句字二元组 Jaccard 超过该值视为重复
+
+# 每字符 token 数（经验值）：中文字符 / 其它字符
+TOKEN_RATES = {
+    "openai": (1.0, 0.25),
+    "deepseek": (0.6, 0.3),
+}
+MODEL_RATES = {
+    "gpt-4o": (0.75, 0.25),
+    "gpt-4o-mini": (0.75, 0.25),
+}
+
+_CJK = re.compile(r"[\u3000-\u9fff\uff00-\uffef]")
+_SENT = re.compile(r"[^。！？!?；;]+[。！？!?；;]*[”’」』\"')）]*|[^。！？!?；;]+$")
+_EN_SENT = re.compile(r"(?<=[.])\s+(?=[A-Z\"“])")
+_DIGITS = re.compile(r"\d+(?:[.,]\d+)*")
+_NAMES = re.compile(r"\b[A-Z][a-zA-Z]+")
+
+
+def _rates(provider, model=None):
+    if model and model in MODEL_RATES:
+        return MODEL_RATES[model]
+    return TOKEN_RATES.get(provider, TOKEN_RATES["openai"])
+
+
+def count_tokens(text, provider="openai", model=None):
+    """按 provider/模型粗估 token 数。"""
+    cjk_rate, other_rate = _rates(provider, model)
+    cjk = len(_CJK.findall(text or ""))
+    return int(cjk * cjk_rate + (len(text or "") - cjk) * other_rate) + 1
+
+
+def split_sentences(text):
+    out = []
+    for part in _SENT.findall(text or ""):
+        out += [s.strip() for s in _EN_SENT.split(part) if s.strip()]
+    return out
+
+
+def _bigrams(s):
+    s = re.sub(r"\s+", "", s.lower())
+    return {s[i:i + 2] for i in range(len(s) - 1)} or {s}
+
+
+def _score(sent, grams, title_grams, index):
+    relevance = len(grams & title_grams) / len(grams)
+    facts = min(len(_DIGITS.findall(sent)), 3) * 0.3 + min(len(_NAMES.findall(sent)), 3) * 0.2
+    return (1 + 2 * relevance + facts) / (1 + 0.05 * index)
+
+
+def truncate(text, budget, provider="openai", model=None):
+    """截取不超过 budget token 的最长前缀（二分查找）。"""
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid], provider, model) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
+
+
+def fit_body(text, title="", provider="openai", model=None, budget=DEFAULT_BUDGET):
+    """返回不超过 budget token 的正文；未超预算时只做去重。非空正文不会返回空串：
+    单句就超预算（没有断句点的长文）时截断该句，而不是整句丢掉。"""
+    title_grams = _bigrams(title) if title else set()
+    kept, kept_grams = [], []
+    for sent in split_sentences(text):
+        grams = _bigrams(sent)
+        if title_grams and len(grams & title_grams) / len(grams) >= TITLE_DUP:
+            continue
+        if any(len(grams & g) / len(grams | g) >= SENT_DUP for g in kept_grams):
+            continue
+        kept.append(sent)
+        kept_grams.append(grams)
+
+    costs = [count_tokens(s, provider, model) for s in kept]
+    if sum(costs) <= budget:
+        chosen = range(len(kept))
+    else:
+        chosen, used = set(), 0
+        lead = list(range(min(LEAD_SENTENCES, len(kept))))
+        ranked = sorted(range(LEAD_SENTENCES, len(kept)),
+                        key=lambda i: _score(kept[i], kept_grams[i], title_grams, i), reverse=True)
+        for i in lead + ranked:
+            if used + costs[i] <= budget:
+                chosen.add(i)
+                used += costs[i]
+            elif costs[i] > budget and (i in lead or not chosen) and used < budget:
+                # 超长的导语句（或一句都还没选上）截到剩余预算
+                kept[i] = truncate(kept[i], budget - used, provider, model)
+                chosen.add(i)
+                used = budget
+    if not chosen and (text or "").strip():
+        # 所有句子都被当作标题复述/重复去掉时退回原文开头
+        kept, chosen = [truncate(text.strip(), budget, provider, model)], [0]
+    # 中文句子直接相连，含西文的正文用空格分隔
+    sep = "" if len(_CJK.findall(text or "")) > len(re.findall(r"[A-Za-z]", text or "")) else " "
+    body = sep.join(kept[i] for i in sorted(chosen))
+    incr("prompt.tokens_trimmed", max(0, count_tokens(text, provider, model) - count_tokens(body, provider, model)))
+    return body
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+ranker.py
+本地抽取式选题（NumPy 向量化），替代或预筛 LLM 的 pick_top：
+- TF-IDF：中文字二元组 + 西文单词（text_tokens.tokenize）
+- 中心度：与其它候选的平均余弦相似度，被多处报道的话题更重要
+- 新颖度：1 - 与前几天文章（article_store 历史）的最大相似度
+- 信息量：正文长度（对数）
+- 按 MMR 依次选取，同一事件不会占多个名额
+用法：
+  from ranker import rank
+  idxs = rank([(title, text), ...], k=10, history=[(title, text), ...])
+依赖：numpy
+"""
+import math
+from collections import Counter
+import numpy as np
+from text_tokens import tokenize
+
+W_CENTRAL, W_NOVEL, W_INFO = 0.5, 0.3, 0.2
+MMR_LAMBDA = 0.5          # 越小越强调与已选文章的差异
+MAX_FEATURES = 4096       # 词表上限（按文档频率取前若干），控制矩阵大小
+TEXT_CHARS = 1200         # 每篇参与计算的正文字数（标题另计两次权重）
+HISTORY_DAYS = 7
+HISTORY_CHUNK = 1024      # 与历史文章分块求相似度，限制峰值内存
+
+
+def _doc_tokens(title, text):
+    return tokenize(title) * 2 + tokenize((text or "")[:TEXT_CHARS])
+
+
+def _build_vocab(token_lists):
+    df = Counter()
+    for toks in token_lists:
+        df.update(set(toks))
+    # 只出现在一篇里的词对相似度没有贡献（候选与历史一起统计，跨天重复的词会保留）
+    common = [t for t, c in df.most_common(MAX_FEATURES) if c > 1] or [t for t, _ in df.most_common(MAX_FEATURES)]
+    vocab = {t: j for j, t in enumerate(common)}
+    n = len(token_lists)
+    idf = np.array([math.log((1 + n) / (1 + df[t])) + 1 for t in common], dtype=np.float32)
+    return vocab, idf
+
+
+def _matrix(token_lists, vocab, idf):
+    """行归一化的 TF-IDF 矩阵（n × |vocab|），tf 取 1 + log(次数)。"""
+    X = np.zeros((len(token_lists), len(vocab)), dtype=np.float32)
+    for i, toks in enumerate(token_lists):
+        counts = Counter(t for t in toks if t in vocab)
+        if counts:
+            X[i, [vocab[t] for t in counts]] = [1 + math.log(c) for c in counts.values()]
+    X *= idf
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    return X / np.maximum(norms, 1e-9)
+
+
+def scores(docs, history=None):
+    """docs/history: [(title, text)]；返回 (综合得分, 相似度矩阵)。"""
+    token_lists = [_doc_tokens(t, x) for t, x in docs]
+    history_tokens = [_doc_tokens(t, x) for t, x in history or []]
+    vocab, idf = _build_vocab(token_lists + history_tokens)
+    X = _matrix(token_lists, vocab, idf)
+    n = len(docs)
+
+    S = X @ X.T
+    np.fill_diagonal(S, 0.0)
+    central = S.sum(axis=1) / max(1, n - 1)
+    central = central / central.max() if central.max() > 0 else central
+
+    novelty = np.ones(n, dtype=np.float32)
+    for start in range(0, len(history_tokens), HISTORY_CHUNK):
+        H = _matrix(history_tokens[start:start + HISTORY_CHUNK], vocab, idf)
+        novelty = np.minimum(novelty, 1.0 - (X @ H.T).max(axis=1))
+
+    info = np.log1p([len(x or "") for _, x in docs]).astype(np.float32)
+    info = info / info.max() if info.max() > 0 else info
+    return W_CENTRAL * central + W_NOVEL * np.clip(novelty, 0, 1) + W_INFO * info, S
+
+
+def rank(docs, k, history=None):
+    """按综合得分做 MMR 选取，返回 min(k, len(docs)) 个索引（重要性降序）。"""
+    n = len(docs)
+    k = min(int(k), n)
+    if k <= 0:
+        return []
+    score, S = scores(docs, history)
+    chosen = []
+    redundancy = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    for _ in range(k):
+        mmr = np.where(available, MMR_LAMBDA * score - (1 - MMR_LAMBDA) * redundancy, -np.inf)
+        i = int(np.argmax(mmr))
+        chosen.append(i)
+        available[i] = False
+        redundancy = np.maximum(redundancy, S[i])
+    return chosen
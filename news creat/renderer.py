@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+renderer.py
+页面渲染（news_webgen.py 与 daily_news_generator.py 共用）：
+- 页面/卡片模板在导入时编译一次（拆成字面量与字段），渲染时只做拼接
+- 主题 CSS 与装饰图形按主题 dict 的哈希缓存，同一主题只生成一次
+- 卡片逐张写入文件（先写临时文件再替换），几千张卡片时内存也不会随之增长
+- 同时生成搜索索引旁路文件（search_index.py），搜索框查索引而不是逐卡子串匹配
+用法：
+  from renderer import render_page, article_card
+  cards = (article_card(a, cover_fn, renditions) for a in articles)
+  render_page("page/daily_news.html", cards, theme=theme, date="2024-05-01", intro="...")
+"""
+import os
+import re
+import json
+import hashlib
+import threading
+from html import escape
+from string import Formatter
+from image_proc import srcset_attrs
+from search_index import SearchIndex, index_path, SEARCH_JS
+from metrics import timed
+
+DEFAULT_FOOTER = "由 AI 自动生成 · 数据来源网络"
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html lang="zh">
+<head>
+<meta charset="utf-8" />
+<meta name="viewport" content="width=device-width,initial-scale=1" />
+<title>{title}</title>
+<style>{css}</style>
+<script>{js}</script>
+</head>
+<body>
+{deco}
+<header><h1>{heading}</h1></header>
+<div class="container">
+  <div class="toolbar">
+    <input type="search" placeholder="输入关键词筛选…" data-index="{index}" oninput="filterCards(this)" />
+  </div>
+  {intro}
+  {nav}
+  <div class="grid">
+"""
+
+CARD = """<article class="card" data-i="{i}" data-key="{key}">
+  {cover}
+  <div class="card-body">
+    <h2>{title}</h2>
+    <div class="meta">{meta}</div>
+    <div class="summary">{summary}</div>
+    <a class="button" href="{link}"{target}>{button}</a>
+  </div>
+</article>
+"""
+
+PAGE_TAIL = """  </div>
+  {nav}
+  <footer>{footer}</footer>
+</div>
+</body></html>
+"""
+
+
+def compile_template(tpl):
+    """把 str.format 风格的模板预先拆成 [(字面量, 字段名)]，返回 fill(dict) -> str。"""
+    parts = [(literal, field) for literal, field, _, _ in Formatter().parse(tpl)]
+
+    def fill(ctx):
+        return "".join(literal + (ctx[field] if field else "") for literal, field in parts)
+    return fill
+
+
+_head, _card, _tail = compile_template(PAGE_HEAD), compile_template(CARD), compile_template(PAGE_TAIL)
+
+
+def _get(d,*path, default=None):
+    cur=d or {}
+    for k in path:
+        if not isinstance(cur, dict) or k not in cur: return default
+        cur = cur[k]
+    return cur
+
+
+def build_css(theme):
+    pal = dict(_get(theme,"palette", default={}) or {})
+    defval = {
+        "bg":"#0f172a","surface":"#111827","text":"#e5e7eb",
+        "muted":"#9ca3af","brand":"#60a5fa","accent1":"#a78bfa","accent2":"#34d399"
+    }
+    for k,v in defval.items(): pal[k]=pal.get(k) or v
+    radius = _get(theme,"radius", default={}) or {}
+    r_card = int(radius.get("card") or 16)
+    r_btn = int(radius.get("button") or 12)
+    r_chip = int(radius.get("chip") or 10)
+    layout = _get(theme,"layout", default={}) or {}
+    grid_min = int(layout.get("grid_min") or 280)
+    density = (layout.get("density") or "comfortable").lower()
+    style = (theme or {}).get("style","glass").lower()
+    background = (theme or {}).get("background") or f"linear-gradient(180deg,{pal['bg']},#0b1324)"
+    use_covers = bool((theme or {}).get("use_covers", True))
+    shadows = _get(theme,"shadows", default={}) or {}
+    sh_card = shadows.get("card") or "0 6px 20px rgba(0,0,0,.28)"
+    sh_btn  = shadows.get("button") or "0 4px 14px rgba(0,0,0,.22)"
+    pad_y = 14 if density=="compact" else 16
+    pad_x = 14 if density=="compact" else 16
+    if style=="glass":
+        card_bg="rgba(255,255,255,.06)"; card_border="1px solid rgba(255,255,255,.10)"; backdrop="backdrop-filter:blur(10px);"
+    elif style=="soft":
+        card_bg=pal["surface"]; card_border="1px solid rgba(255,255,255,.06)"; backdrop=""
+    else:
+        card_bg=pal["surface"]; card_border="1px solid rgba(255,255,255,.08)"; backdrop=""
+    css = f"""
+:root{{--bg:{pal['bg']};--surface:{pal['surface']};--text:{pal['text']};--muted:{pal['muted']};
+--brand:{pal['brand']};--accent1:{pal['accent1']};--accent2:{pal['accent2']};
+--r-card:{r_card}px;--r-btn:{r_btn}px;--r-chip:{r_chip}px;--sh-card:{sh_card};--sh-btn:{sh_btn};}}
+*{{box-sizing:border-box}} html,body{{margin:0;padding:0;background:{background};color:var(--text);
+font-family:system-ui,-apple-system,Segoe UI,Roboto,Helvetica,Arial}}
+header{{padding:24px 16px;text-align:center;position:sticky;top:0;background:color-mix(in oklab, var(--surface) 70%, transparent);
+backdrop-filter:blur(8px);border-bottom:1px solid rgba(255,255,255,.06);z-index:10}}
+h1{{margin:0;font-size:26px;letter-spacing:.5px}}
+.container{{max-width:1200px;margin:0 auto;padding:18px}}
+.intro{{background:color-mix(in oklab, var(--brand) 14%, transparent);border:1px solid color-mix(in oklab, var(--brand) 28%, transparent);
+padding:14px 16px;border-radius:12px;margin:16px 0;color:#dbeafe}}
+.toolbar{{display:flex;gap:12px;align-items:center;margin:14px 0 6px}}
+input[type=search]{{flex:1;padding:10px 12px;border-radius:10px;border:1px solid rgba(255,255,255,.12);
+background:color-mix(in oklab, var(--surface) 85%, #000 15%);color:var(--text)}}
+.grid{{display:grid;grid-template-columns:repeat(auto-fill,minmax({grid_min}px,1fr));gap:16px;margin-top:12px}}
+.card{{background:{card_bg};{backdrop}border:{card_border};border-radius:var(--r-card);overflow:hidden;box-shadow:var(--sh-card);display:flex;flex-direction:column}}
+.cover{{display:block;width:100%;aspect-ratio:16/9;object-fit:cover;background:#0a0f1c}}
+.card-body{{padding:{pad_y}px {pad_x}px {pad_y+2}px}}
+.card h2{{font-size:18px;margin:0 0 8px;color:#e2e8f0;line-height:1.35}}
+.meta{{font-size:12px;color:var(--muted);margin-bottom:8px}}
+.summary{{font-size:14px;color:#d1d5db;line-height:1.6}}
+.summary ul{{margin:8px 0 0 18px;padding:0}}
+.summary .kw{{color:var(--muted);font-size:12px;margin-top:6px}}
+.pager{{display:flex;flex-wrap:wrap;gap:14px;justify-content:center;margin:14px 0;color:var(--muted);font-size:14px}}
+.pager a{{color:var(--brand);text-decoration:none}}
+a.button{{display:inline-block;margin-top:10px;padding:8px 12px;background:var(--brand);color:#0b1220;text-decoration:none;border-radius:var(--r-btn);font-weight:700;box-shadow:var(--sh-btn)}}
+a.button:hover{{transform:translateY(-1px);transition:transform .2s ease}}
+footer{{text-align:center;color:var(--muted);padding:22px 0;margin-top:26px;border-top:1px solid rgba(255,255,255,.06)}}
+.decor{{position:fixed;inset:auto;pointer-events:none;z-index:0;filter:blur(0)}}
+.blob{{border-radius:50%;}}
+.ring{{border:2px solid currentColor;border-radius:50%;background:transparent}}
+.stripe{{height:2px;width:60vw;max-width:800px}}
+"""
+    return css, use_covers
+
+
+def shapes_html(theme):
+    def _style(pos):
+        if not isinstance(pos, dict): return ""
+        return ";".join([f"{k}:{v}" for k,v in pos.items() if v])
+    html=[]
+    for shp in (theme.get("shapes") or []):
+        typ = (shp.get("type") or "blob").lower()
+        color = shp.get("color") or "var(--accent1)"
+        opacity = shp.get("opacity") or 0.18
+        size = shp.get("size") or "600px"
+        blur = shp.get("blur")
+        pos = _style(shp.get("position") or {})
+        extra = f"filter:blur({blur});" if blur else ""
+        common = f"style='color:{color};background:{color};opacity:{opacity};width:{size};height:{size};{pos};{extra}'"
+        cls = "blob" if typ=="blob" else ("ring" if typ=="ring" else "stripe")
+        html.append(f"<div class='decor {cls}' {common}></div>")
+    return "\n".join(html)
+
+
+_theme_cache, _theme_lock = {}, threading.Lock()
+
+
+def theme_key(theme):
+    return hashlib.sha1(json.dumps(theme or {}, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def theme_assets(theme):
+    """返回 (css, use_covers, deco_html)，按主题哈希缓存。"""
+    key = theme_key(theme)
+    with _theme_lock:
+        hit = _theme_cache.get(key)
+    if hit is None:
+        css, covers = build_css(theme or {})
+        hit = (css, covers, shapes_html(theme or {}))
+        with _theme_lock:
+            _theme_cache[key] = hit
+    return hit
+
+
+def use_covers(theme):
+    return theme_assets(theme)[1]
+
+
+def parse_summary(raw):
+    """把 LLM 摘要拆成 {title, bullets, other, keywords}；首行不超过 28 字且不是要点时视为标题。"""
+    lines = [ln.strip() for ln in (raw or "").splitlines() if ln.strip()]
+    title = ""
+    if lines and len(lines[0]) <= 28 and "•" not in lines[0] and "关键词" not in lines[0]:
+        title, lines = lines[0], lines[1:]
+    return {
+        "title": title,
+        "bullets": [ln[1:].strip() for ln in lines if ln.startswith("•")],
+        "other": [ln for ln in lines if not ln.startswith("•") and not ln.startswith("关键词")],
+        "keywords": next((ln for ln in lines if ln.startswith("关键词")), ""),
+    }
+
+
+def article_card(a, cover_fn=None, renditions=None, title_from_summary=False, prefix="assets/"):
+    """news_data.json 的一篇文章 → 卡片数据；title_from_summary 时优先用摘要首行作标题，
+    prefix 为封面目录相对页面的路径。"""
+    parsed = parse_summary(a.get("raw_summary"))
+    title = (parsed["title"] if title_from_summary and parsed["title"] else a.get("title")) or ""
+    return {
+        "title": title, "link": a.get("link") or "", "meta": a.get("site") or "",
+        "bullets": parsed["bullets"], "other": parsed["other"], "keywords": parsed["keywords"],
+        "cover_attrs": srcset_attrs(cover_fn, renditions or {}, prefix) if cover_fn else "",
+    }
+
+
+def card_html(c, i=0):
+    """c 可带 button（按钮文字）与 internal（站内链接，不开新窗口）。"""
+    title = escape(c.get("title") or "")
+    if c.get("bullets"):
+        summary = "<ul>" + "".join(f"<li>{escape(b)}</li>" for b in c["bullets"]) + "</ul>"
+    else:
+        summary = f"<p>{escape(' '.join(c.get('other') or []))}</p>" if c.get("other") else ""
+    if c.get("keywords"):
+        summary += f"<p class='kw'>{escape(c['keywords'])}</p>"
+    summary = summary or "<p>（暂无摘要）</p>"
+    cover = (f"<img class='cover' {c['cover_attrs']} loading='lazy' decoding='async' alt='{title}' />"
+             if c.get("cover_attrs") else "")
+    key = " ".join(filter(None, [c.get("title"), c.get("meta"), c.get("keywords")])).lower()
+    return _card({"i": str(i), "key": escape(key), "cover": cover, "title": title, "meta": escape(c.get("meta") or ""),
+                  "summary": summary, "link": escape(c.get("link") or ""),
+                  "target": "" if c.get("internal") else ' target="_blank" rel="noopener"',
+                  "button": escape(c.get("button") or "阅读原文")})
+
+
+def card_texts(c):
+    """参与搜索索引的字段：标题、来源、要点（没有要点时用摘要正文）、关键词。"""
+    keywords = re.sub(r"^关键词[:：]?", "", c.get("keywords") or "")
+    return [c.get("title"), c.get("meta"), *(c.get("bullets") or c.get("other") or []), keywords]
+
+
+def render_page(path, cards, theme=None, date="", intro="", footer=DEFAULT_FOOTER, title=None, nav=""):
+    """把卡片（可为生成器）逐张写入 path，并在旁边写出搜索索引；返回写出的卡片数。
+    nav 为已转义的导航 HTML（翻页等），放在卡片列表前后。"""
+    css, _, deco = theme_assets(theme)
+    title = title or (f"每日新闻简报 - {date}" if date else "每日新闻简报")
+    index = SearchIndex()
+    ipath = index_path(path)
+    with timed("render"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(_head({"title": escape(title), "css": css, "js": SEARCH_JS, "deco": deco,
+                           "heading": escape(title.replace(" - ", " · ")), "nav": nav,
+                           "intro": f'<div class="intro">{escape(intro)}</div>' if intro else "",
+                           "index": escape(os.path.basename(ipath))}))
+            for c in cards:
+                f.write(card_html(c, index.add(card_texts(c))))
+            f.write(_tail({"nav": nav, "footer": escape(footer)}))
+        index.write(ipath)
+        os.replace(tmp, path)
+    return index.n
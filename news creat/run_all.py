@@ -1,17 +1,23 @@
 # -*- coding: utf-8 -*-
 """
 run_all.py
-一键流水线：
-  [1/3] 运行爬虫 pa.py
-  [2/3] AI 分析 news_analyzer.py  ->  code/news_data.json
-  [3/3] 网页生成 news_webgen.py   ->  F:/creat/pa/page/daily_news.html
+一键流水线（单进程内依次调用各阶段函数，记录在内存中传递）：
+  [1/3] 爬虫       pa.crawl_sites            ->  [(文本, URL)]
+  [2/3] AI 分析    news_analyzer.analyze     ->  {date, overall_intro, theme, articles}
+  [3/3] 网页生成   news_webgen.render        ->  F:/creat/pa/page/daily_news.html
+用法：
+  python run_all.py                 # 全流程，不落中间文件
+  python run_all.py --checkpoint    # 额外写出中间文件（爬虫结果 txt、code/news_data.json）
+  python run_all.py --from-source   # 跳过爬虫，直接读取固定的爬虫结果文件
+  python run_all.py --sites sites.json --limit 30   # 指定种子站点（JSON，格式同 pa.py --sites）与分析篇数
+爬虫默认爬取 pa.SEED_SITES 全部站点，链接按站点轮流排列后再取前 --limit 篇，每个站点都有文章入选。
 
 你可以在这里直接声明 API Key（如不想在系统环境里设）：
   os.environ["OPENAI_API_KEY"] = "YOUR_OPENAI_KEY"
   os.environ["DEEPSEEK_API_KEY"] = "YOUR_DEEPSEEK_KEY"
 优先级：环境变量 > 此处硬编码。
 """
-import subprocess, os, sys
+import os, argparse
 
 # ====== 可选：在此放你的 Key（占位符，建议改成环境变量）======
 os.environ["OPENAI_API_KEY"] = "………………………………"
@@ -21,33 +27,55 @@ os.environ["OPENAI_API_KEY"] = "………………………………"
 base_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(base_dir)
 
-# 固定读取的爬虫结果文件（不要改）
-FIXED_SOURCE = r"F:\creat\pa\code\result_with_links22.txt"
-
-print("[1/3] 正在运行爬虫程序...")
-subprocess.run([sys.executable, "pa.py"], check=True)
+import pa
+import news_analyzer
+import news_webgen
+import metrics
 
-if not os.path.exists(FIXED_SOURCE):
-    raise FileNotFoundError(f"未找到固定爬虫输出：{FIXED_SOURCE}。请确认 pa.py 写出的文件路径一致。")
-
-print(f"使用固定文件：{FIXED_SOURCE}")
+# 固定读取/写出的爬虫结果文件（不要改）
+FIXED_SOURCE = r"F:\creat\pa\code\result_with_links22.txt"
+DATA_JSON = os.path.join("code", "news_data.json")
 
 # 你可以在这里切换 provider: openai | deepseek
 PROVIDER = os.environ.get("NEWS_PROVIDER", "openai").lower()
 
-print("[2/3] 正在分析与生成数据 JSON...")
-subprocess.run([
-    sys.executable, "news_analyzer.py",
-    "--source", FIXED_SOURCE,
-    "--out", os.path.join("code","news_data.json"),
-    "--provider", PROVIDER
-], check=True)
 
-print("[3/3] 正在生成每日新闻 HTML...")
-subprocess.run([sys.executable, "news_webgen.py", "--data", os.path.join("code","news_data.json")], check=True)
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--checkpoint", action="store_true", help="写出爬虫结果与 news_data.json 作为中间检查点")
+    ap.add_argument("--from-source", action="store_true", help="跳过爬虫，读取固定的爬虫结果文件")
+    ap.add_argument("--sites", type=str, default=None, help="种子站点 JSON 配置文件（默认 pa.SEED_SITES）")
+    ap.add_argument("--limit", type=int, default=18, help="送去分析的文章数上限")
+    args = ap.parse_args()
 
-print("全部完成！请到 F:/creat/pa/page 查看 daily_news.html 与 assets/ 封面图。")
+    if args.from_source:
+        if not os.path.exists(FIXED_SOURCE):
+            raise FileNotFoundError(f"未找到固定爬虫输出：{FIXED_SOURCE}。请确认 pa.py 写出的文件路径一致。")
+        print(f"使用固定文件：{FIXED_SOURCE}")
+        pairs = news_analyzer.load_pairs(FIXED_SOURCE)
+    else:
+        print("[1/3] 正在运行爬虫...")
+        sites = pa.load_sites(args.sites) if args.sites else pa.SEED_SITES
+        titles, unique_links = pa.crawl_sites(sites)
+        if not unique_links:
+            raise RuntimeError("爬虫未找到任何有效的新闻链接。")
+        # 按站点轮流排列，否则前 --limit 篇几乎全来自第一个站点，其余站点白爬
+        unique_links = pa.interleave_by_site(unique_links)
+        pairs = pa.links_to_pairs(unique_links)
+        if args.checkpoint:
+            pa.write_links(FIXED_SOURCE, " | ".join(titles), unique_links)
 
+    print("[2/3] 正在分析与生成数据...")
+    data = news_analyzer.analyze(pairs, provider=PROVIDER, limit=args.limit)
+    if args.checkpoint:
+        news_analyzer.save_data(data, DATA_JSON)
+        print(f"[检查点] {DATA_JSON}")
 
+    print("[3/3] 正在生成每日新闻 HTML...")
+    out_html = news_webgen.render(data)
+    print(f"[报告] {metrics.write_report(os.path.join('code', metrics.REPORT_NAME))}")
+    print(f"全部完成！请到 {os.path.dirname(out_html)} 查看 daily_news.html 与 assets/ 封面图。")
 
 
+if __name__ == "__main__":
+    main()
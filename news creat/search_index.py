@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+search_index.py
+页面搜索用的倒排索引（renderer.py 写页面时顺带生成，作为 JSON 旁路文件放在页面旁边）：
+- 词元与排序/去重一致（text_tokens.tokenize：中文字二元组 + 西文小写单词）
+- 索引标题、要点、关键词和来源站点，摘要正文也能搜到
+- 格式紧凑：{"v": 1, "n": 卡片数, "postings": {词元: [卡片序号, ...]}}，序号升序
+浏览器端（SEARCH_JS）输入防抖后查索引：各词元求交集，查不到的词元按前缀匹配（正在输入的半个词、单个汉字）；
+索引加载失败时（如直接用 file:// 打开页面）退回逐卡 data-key 子串匹配。
+用法：
+  from search_index import SearchIndex, index_path
+  idx = SearchIndex()
+  idx.add([title, *bullets, keywords])   # 返回文档序号
+  idx.write(index_path("page/daily_news.html"))
+"""
+import os
+import json
+import tempfile
+from text_tokens import tokenize, STOPWORDS
+
+VERSION = 1
+SUFFIX = ".search.json"
+DEBOUNCE_MS = 120
+
+
+def index_path(page_path):
+    """页面对应的索引文件路径：daily_news.html -> daily_news.search.json"""
+    return os.path.splitext(page_path)[0] + SUFFIX
+
+
+class SearchIndex:
+    def __init__(self):
+        self.postings = {}
+        self.n = 0
+
+    def add(self, texts):
+        """texts: 一篇文档的各字段文本；返回文档序号（从 0 开始）。"""
+        doc = self.n
+        self.n += 1
+        for tok in dict.fromkeys(t for text in texts if text for t in tokenize(text)):
+            self.postings.setdefault(tok, []).append(doc)
+        return doc
+
+    def to_dict(self):
+        return {"v": VERSION, "n": self.n, "postings": self.postings}
+
+    def write(self, path):
+        d = os.path.dirname(path) or "."
+        os.makedirs(d, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=d, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+
+# 与 text_tokens.tokenize 保持一致的浏览器端分词 + 查询
+SEARCH_JS = """
+const SEARCH_STOP = new Set(%(stop)s);
+let searchIndex = null, searchKeys = null, searchCards = null, searchTimer = null;
+function searchTokens(q){
+  const toks = [];
+  (q.match(/[\\u4e00-\\u9fff]+/g) || []).forEach(run=>{
+    if (run.length === 1) toks.push(run);
+    else for (let i = 0; i + 1 < run.length; i++) toks.push(run.slice(i, i + 2));
+  });
+  (q.toLowerCase().match(/[a-z][a-z'\\-]*|\\d+(?:\\.\\d+)?/g) || []).forEach(w=>{ if (!SEARCH_STOP.has(w)) toks.push(w); });
+  return toks;
+}
+function searchLookup(tok){
+  if (searchIndex.has(tok)) return searchIndex.get(tok);
+  let lo = 0, hi = searchKeys.length;   // 前缀匹配：二分找到第一个 >= tok 的词元
+  while (lo < hi){ const m = (lo + hi) >> 1; if (searchKeys[m] < tok) lo = m + 1; else hi = m; }
+  const out = new Set();
+  for (let i = lo; i < searchKeys.length && searchKeys[i].startsWith(tok); i++) searchIndex.get(searchKeys[i]).forEach(d=>out.add(d));
+  return out;
+}
+function searchQuery(toks){
+  let hit = null;
+  for (const t of toks){
+    const docs = new Set(searchLookup(t));
+    hit = hit === null ? docs : new Set([...hit].filter(d=>docs.has(d)));
+    if (!hit.size) break;
+  }
+  return hit;
+}
+function applyFilter(q){
+  searchCards = searchCards || Array.from(document.querySelectorAll('.card'));
+  q = (q || '').trim().toLowerCase();
+  const toks = searchTokens(q);
+  if (searchIndex && toks.length){
+    const hit = searchQuery(toks);
+    searchCards.forEach(c=>{ c.style.display = hit.has(+c.dataset.i) ? '' : 'none'; });
+    return;
+  }
+  searchCards.forEach(c=>{
+    const text = c.getAttribute('data-key') || '';
+    c.style.display = text.includes(q) ? '' : 'none';
+  });
+}
+function filterCards(ev){
+  clearTimeout(searchTimer);
+  const q = ev.value;
+  searchTimer = setTimeout(()=>applyFilter(q), %(debounce)d);
+}
+document.addEventListener('DOMContentLoaded', ()=>{
+  const box = document.querySelector('input[type=search]');
+  if (!box || !box.dataset.index || !window.fetch) return;
+  fetch(box.dataset.index).then(r=>r.ok ? r.json() : null).then(d=>{
+    if (!d || d.v !== %(version)d) return;
+    searchIndex = new Map(Object.entries(d.postings));   // Map：查询词不会撞上 constructor 等原型属性
+    searchKeys = [...searchIndex.keys()].sort();
+    if (box.value) applyFilter(box.value);
+  }).catch(()=>{});
+});
+""" % {"stop": json.dumps(sorted(STOPWORDS)), "debounce": DEBOUNCE_MS, "version": VERSION}
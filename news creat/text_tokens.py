@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+text_tokens.py
+排序/去重/检索共用的分词：中文按字二元组（单字成词时保留单字），西文按小写单词，数字原样保留。
+用法：
+  from text_tokens import tokenize
+  tokenize("英国首相访华 UK PM visits China")  # ['英国', '国首', ..., 'uk', 'pm', 'visits', 'china']
+"""
+import re
+
+_CJK_RUN = re.compile(r"[\u4e00-\u9fff]+")
+_WORD = re.compile(r"[A-Za-z][A-Za-z'\-]*|\d+(?:\.\d+)?")
+STOPWORDS = {"a", "an", "the", "of", "to", "in", "on", "for", "and", "or", "is", "are", "was", "were",
+             "be", "by", "with", "as", "at", "it", "its", "that", "this", "from", "has", "have", "s"}
+
+
+def tokenize(text):
+    text = text or ""
+    tokens = []
+    for run in _CJK_RUN.findall(text):
+        tokens += [run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)]
+    tokens += [w for w in (m.lower() for m in _WORD.findall(text)) if w not in STOPWORDS]
+    return tokens